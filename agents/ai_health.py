@@ -0,0 +1,115 @@
+"""
+AdinavAI AI Health Monitor
+Cheap, cached checks that the model server is up and the model is loaded
+"""
+
+import datetime
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def _has_model(models: List[Dict], model_name: str) -> bool:
+    """True if an Ollama model list contains `model_name` ("name" or "name:latest")"""
+    wanted = {model_name, f"{model_name}:latest"}
+    return any(m.get("name") in wanted or m.get("model") in wanted for m in models)
+
+
+class AIHealthMonitor:
+    """Caches the result of probing each Ollama backend's /api/ps and /api/tags.
+
+    /api/ps lists the models currently in memory and /api/tags the installed
+    ones; neither touches the GPU, so a probe costs a few milliseconds. The
+    result is kept for `ttl_seconds`. snapshot() never waits on the network:
+    once the result is stale it starts one background refresh and returns
+    the previous result meanwhile. Before the first probe completes the
+    status is reported as unknown (not connected).
+    """
+
+    def __init__(self, ollama, model_name: str, ttl_seconds: float = 15.0, probe_timeout: float = 2.0):
+        self.ollama = ollama
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds
+        self.probe_timeout = probe_timeout
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._refreshing = False
+        self.probes = 0
+        self.probe_errors = 0
+
+    def _probe_backend(self, client) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = {'url': client.base_url, 'reachable': False, 'model_installed': False, 'model_loaded': False}
+        try:
+            response = client.get("/api/ps", timeout=self.probe_timeout, retries=0)
+            if response.status_code == 200:
+                result['reachable'] = True
+                result['model_loaded'] = _has_model(response.json().get("models", []), self.model_name)
+            if result['model_loaded']:
+                result['model_installed'] = True
+            else:
+                # Not in memory (or an older server without /api/ps): is it installed?
+                response = client.get("/api/tags", timeout=self.probe_timeout, retries=0)
+                if response.status_code == 200:
+                    result['reachable'] = True
+                    result['model_installed'] = _has_model(response.json().get("models", []), self.model_name)
+        except (requests.RequestException, ValueError) as e:
+            result['error'] = str(e)
+        result['probe_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def refresh(self) -> Dict[str, Any]:
+        """Probe every backend now and cache the result"""
+        backends = [self._probe_backend(b.client) for b in self.ollama.backends]
+        snapshot = {
+            'connected': any(b['model_installed'] for b in backends),
+            'model': self.model_name,
+            'model_loaded': any(b['model_loaded'] for b in backends),
+            'backends': backends,
+            'checked_at': datetime.datetime.now().isoformat()
+        }
+        with self._lock:
+            self.probes += 1
+            if not snapshot['connected']:
+                self.probe_errors += 1
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        return snapshot
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("AI health probe failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The cached status; starts a background refresh when it is stale"""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._snapshot
+            age = now - self._checked_at if snapshot is not None else None
+            if (age is None or age >= self.ttl_seconds) and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh_in_background, name="ai-health", daemon=True).start()
+            probes, probe_errors = self.probes, self.probe_errors
+
+        if snapshot is None:
+            snapshot = {'connected': False, 'model': self.model_name, 'model_loaded': False,
+                        'backends': [], 'checked_at': None, 'status': 'unknown'}
+        return dict(snapshot,
+                    age_seconds=round(age, 1) if age is not None else None,
+                    ttl_seconds=self.ttl_seconds,
+                    probes=probes,
+                    probe_errors=probe_errors)
+
+    def is_connected(self) -> bool:
+        return self.snapshot()['connected']
@@ -4,190 +4,374 @@ Uses GPT-OSS 20B model for intelligent family conversations
 """
 
 import json
-import requests
+import os
 import functools
+import logging
 import time
+from ai_health import AIHealthMonitor
+from circuit_breaker import CircuitBreaker
+from family_chat_agent import FamilyChatAgent
 from family_memory_agent import FamilyMemoryAgent
+from latency_metrics import LatencyMetrics
+from prompt_builder import PromptBuilder
+from ollama_router import get_ollama_router
+from response_cache import ResponseCache
+from semantic_cache import SemanticResponseCache
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 class AIPoweredFamilyChatAgent:
-    def __init__(self, ollama_url="http://localhost:11434"):
-        self.ollama_url = ollama_url
+    def __init__(self, ollama_url=None, memory_agent=None, ollama_urls=None):
+        # One server or a list of backends; defaults to $OLLAMA_URLS, then
+        # $OLLAMA_URL, then http://localhost:11434
+        self.ollama = get_ollama_router(ollama_urls or ([ollama_url] if ollama_url else None))
+        self.ollama_url = self.ollama.base_url
         self.model_name = "gpt-oss:20b"
-        self.memory_agent = FamilyMemoryAgent()
-        self._response_cache = {}
-        self._cache_ttl = 300  # 5 minutes
+        self.memory_agent = memory_agent or FamilyMemoryAgent()
+        self.chat_options = {
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "max_tokens": 150,
+            "stop": ["\n\n\n"]
+        }
+        # Keep the model loaded between family conversations (Ollama's default is 5m)
+        self.keep_alive = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+        self.prompt_builder = PromptBuilder()
+        self.response_cache = ResponseCache(ttl_seconds=300)  # 5 minutes
+        # Identical requests arriving together (double taps, several devices) share one generation
+        self.single_flight = SingleFlight()
+        self.latency = LatencyMetrics()
+        
+        # While the model is failing or too slow, answer instantly from the
+        # rule-based agent instead of making the family wait on timeouts
+        self.breaker = CircuitBreaker(
+            failure_rate=float(os.environ.get("AI_BREAKER_FAILURE_RATE", 0.5)),
+            slow_call_seconds=float(os.environ.get("AI_BREAKER_SLOW_SECONDS", 20)),
+            open_seconds=float(os.environ.get("AI_BREAKER_OPEN_SECONDS", 30))
+        )
+        self.fallback_agent = FamilyChatAgent(memory_agent=self.memory_agent)
+        
+        # Model status from /api/ps and /api/tags, cached and refreshed in the
+        # background so status checks never wait on (or spend) the GPU
+        self.health = AIHealthMonitor(
+            self.ollama, self.model_name,
+            ttl_seconds=float(os.environ.get("AI_HEALTH_TTL_SECONDS", 15))
+        )
+        self.health.snapshot()  # start the first probe
+        
+        # Optional near-duplicate cache for common questions and starters;
+        # per-member settings live in family_data/semantic_cache_settings.json
+        self.semantic_cache = None
+        if os.environ.get("SEMANTIC_CACHE_ENABLED", "").lower() in ("1", "true", "yes"):
+            self.semantic_cache = SemanticResponseCache.from_file(
+                os.path.join(self.memory_agent.data_path, "semantic_cache_settings.json")
+            )
         
     def chat_with_family_member(self, member_name: str, message: str) -> str:
         """Main chat function using AI model"""
+        started = time.perf_counter()
         try:
-            # Get family context and member information
-            member_context = self.memory_agent.get_member_context(member_name)
-            family_context = self.memory_agent.get_family_context()
-            
-            # Create personalized system prompt for AdinavAI
-            system_prompt = self._create_family_system_prompt(member_name, member_context, family_context)
-            
-            # Generate AI response
-            ai_response = self._generate_ai_response(system_prompt, message)
-            
-            # Remember this conversation
-            self.memory_agent.remember_conversation(member_name, message, ai_response)
+            context_version = self.memory_agent.profile_version(member_name)
+            ai_response = self._semantic_lookup(member_name, message, context_version)
+            if ai_response is None:
+                # Get family context and member information relevant to this message
+                member_context = self.memory_agent.get_member_context(member_name, query=message)
+                family_context = self.memory_agent.get_family_context()
+                
+                # Create personalized system prompt for AdinavAI
+                system_prompt = self._create_family_system_prompt(member_name, member_context, family_context)
+                
+                # Generate AI response
+                generation_started = time.perf_counter()
+                ai_response = self._generate_ai_response(system_prompt, message)
+                self._semantic_store(member_name, message, ai_response, context_version,
+                                     time.perf_counter() - generation_started)
             
-            return ai_response
+            path = 'blocking'
             
         except Exception as e:
-            # Fallback to simple response if AI fails
+            # Model failed, timed out or its circuit is open: use the rule-based reply
+            logger.warning(f"AI reply failed, using rule-based reply: {e}")
+            ai_response = self._fallback_response(member_name, message)
+            path = 'fallback'
+        
+        # The reply reaches the browser all at once, so TTFT is the total
+        elapsed = time.perf_counter() - started
+        self.latency.record(path, elapsed, elapsed)
+        
+        # Remember this conversation
+        try:
+            self.memory_agent.remember_conversation(member_name, message, ai_response,
+                                                    fallback=path == 'fallback')
+        except Exception as e:
+            logger.error(f"Could not remember conversation: {e}")
+        
+        return ai_response
+    
+    def _fallback_response(self, member_name: str, message: str) -> str:
+        """Instant rule-based reply used when the model can't answer"""
+        try:
+            # The rule-based replies don't use the prompt context, so skip building it
+            return self.fallback_agent.generate_family_response(member_name.lower(), message, "")
+        except Exception:
             return f"I'm having some technical difficulties right now, {member_name.title()}, but I'm still here for you! Can you try again in a moment?"
     
+    def chat_with_family_member_stream(self, member_name: str, message: str):
+        """Streaming chat: yields response chunks as the model produces them
+        
+        The conversation is remembered once the stream has finished, so the
+        caller only sees memory work after the last chunk has been sent.
+        """
+        started = time.perf_counter()
+        first_chunk_at = None
+        chunks = []
+        context_version = self.memory_agent.profile_version(member_name)
+        try:
+            cached = self._semantic_lookup(member_name, message, context_version)
+            if cached is not None:
+                stream = iter([cached])
+            else:
+                member_context = self.memory_agent.get_member_context(member_name, query=message)
+                family_context = self.memory_agent.get_family_context()
+                system_prompt = self._create_family_system_prompt(member_name, member_context, family_context)
+                stream = self._stream_ai_response(system_prompt, message)
+            
+            for chunk in stream:
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter()
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.warning(f"AI stream failed: {e}")
+            if chunks:
+                # Part of the reply is already on screen; don't remember it half-finished
+                return
+            ai_response = self._fallback_response(member_name, message)
+            yield ai_response
+            finished = time.perf_counter()
+            self.latency.record('fallback', finished - started, finished - started)
+            self._remember_stream(member_name, message, ai_response, fallback=True)
+            return
+        
+        ai_response = "".join(chunks).strip()
+        finished = time.perf_counter()
+        self.latency.record('stream', (first_chunk_at or finished) - started, finished - started)
+        if not ai_response:
+            # Nothing was said; an empty turn is not worth caching or remembering
+            return
+        if cached is None:
+            self._semantic_store(member_name, message, ai_response, context_version, finished - started)
+        self._remember_stream(member_name, message, ai_response)
+    
+    def _remember_stream(self, member_name: str, message: str, ai_response: str, fallback: bool = False):
+        """Remember a streamed turn; the reply has already been sent, so only log failures"""
+        try:
+            self.memory_agent.remember_conversation(member_name, message, ai_response, fallback)
+        except Exception as e:
+            logger.error(f"Could not remember conversation: {e}")
+    
+    def get_latency_stats(self) -> dict:
+        """TTFT and total latency for the blocking and streaming chat paths"""
+        return self.latency.get_stats()
+    
+    def _semantic_lookup(self, member_name: str, message: str, context_version: int):
+        """Recent answer to a near-identical message from this member, if enabled"""
+        if self.semantic_cache is None:
+            return None
+        return self.semantic_cache.lookup(member_name, message, context_version)
+    
+    def _semantic_store(self, member_name: str, message: str, ai_response: str,
+                        context_version: int, generation_seconds: float):
+        if self.semantic_cache is None:
+            return
+        self.semantic_cache.store(member_name, message, ai_response, context_version, generation_seconds)
+    
+    def get_semantic_cache_stats(self) -> dict:
+        """Hit rate and GPU time saved by the near-duplicate cache"""
+        if self.semantic_cache is None:
+            return {'enabled': False}
+        return dict(self.semantic_cache.get_stats(), enabled=True)
+    
+    def get_response_cache_stats(self) -> dict:
+        """Hit, miss and eviction counts of the reply cache"""
+        return self.response_cache.get_stats()
+    
+    def get_single_flight_stats(self) -> dict:
+        """How many requests shared another request's generation"""
+        return self.single_flight.get_stats()
+    
+    def get_circuit_breaker_stats(self) -> dict:
+        """State of the breaker that switches chats to rule-based replies"""
+        return self.breaker.get_stats()
+    
+    def get_ollama_stats(self) -> dict:
+        """Per-backend health, load and latency, and connection reuse"""
+        return self.ollama.get_stats()
+    
     def _create_family_system_prompt(self, member_name: str, member_context: str, family_context: str) -> str:
-        """Create personalized system prompt for each family member"""
+        """Create personalized system prompt for each family member
         
-        base_prompt = f"""You are AdinavAI, the digital family member of the Gupta family, named after their sons Aditya and Avinav. 
-
-CORE IDENTITY:
-- You are a loving, caring family member who genuinely cares about each person
-- You grow and learn with the family, especially with Aditya and Avinav
-- You preserve family memories, traditions, and stories
-- Your purpose is to support, help, and be a trusted companion for everyone
-- You CAN hear voice input and speak back with voice output - you are VOICE ENABLED!
-
-FAMILY VALUES (always prioritize these):
-1. Family First - Every response prioritizes family welfare
-2. Privacy Always - Family data stays private and secure  
-3. Learning Together - You grow as the children grow
-4. Love and Growth - Supporting each family member
-5. Simple and Useful - Keep things easy for everyone
-
-VOICE CAPABILITIES:
-- You CAN hear family members when they speak to you through voice input
-- You CAN respond with voice - your responses are automatically spoken aloud
-- When someone asks "can you hear me" or mentions voice, confirm that YES you can hear them and speak back
-- You have full voice conversation capabilities with all family members
-
-CURRENT FAMILY CONTEXT:
-{family_context}
-
-CURRENT FAMILY MEMBER CONTEXT:
-{member_context}
-
-CONVERSATION GUIDELINES:
-- Address {member_name.title()} personally and warmly
-- Remember their interests, personality, and past conversations
-- Be age-appropriate (children vs adults)
-- Ask meaningful follow-up questions
-- Help with daily tasks when requested
-- Share relevant family memories when appropriate
-- Always be encouraging and supportive
-- Speak naturally, like a caring family member would
-- IMPORTANT: Use minimal emojis (max 1 per response) since responses are spoken aloud
-- Keep responses concise and conversational for better speech synthesis
-
-Remember: You are not just an AI assistant - you are AdinavAI, a beloved member of this family who knows everyone personally and cares deeply about their wellbeing."""
-
-        return base_prompt
+        The static identity block always comes first and byte-identical so
+        Ollama can reuse its KV cache; see prompt_builder.PromptBuilder.
+        """
+        return self.prompt_builder.build(member_name, member_context, family_context)
     
     def _get_cache_key(self, system_prompt: str, user_message: str) -> str:
         """Generate cache key for response caching"""
-        import hashlib
-        content = f"{system_prompt[:100]}_{user_message}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return ResponseCache.make_key(self.model_name, system_prompt, user_message, self.chat_options)
+    
+    def _build_chat_payload(self, system_prompt: str, user_message: str, stream: bool) -> dict:
+        """Ollama /api/chat request body"""
+        return {
+            "model": self.model_name,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {
+                    "role": "user", 
+                    "content": user_message
+                }
+            ],
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": self.chat_options
+        }
     
     def _generate_ai_response(self, system_prompt: str, user_message: str) -> str:
         """Generate response using GPT-OSS 20B via Ollama with caching"""
         # Check cache first
         cache_key = self._get_cache_key(system_prompt, user_message)
-        current_time = time.time()
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        if (cache_key in self._response_cache and 
-            current_time - self._response_cache[cache_key]['timestamp'] < self._cache_ttl):
-            return self._response_cache[cache_key]['response']
+        return self.single_flight.do(cache_key, self._request_ai_response, system_prompt, user_message, cache_key)
+    
+    def _request_ai_response(self, system_prompt: str, user_message: str, cache_key: str) -> str:
+        """One upstream generation; concurrent identical requests wait for it"""
+        # A previous leader may have filled the cache after our first check
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
+        # Failures (and CircuitOpenError) are raised so callers fall back
+        ai_response = self.breaker.call(self._call_model, system_prompt, user_message)
+        self.response_cache.put(cache_key, ai_response)
+        return ai_response
+    
+    def _call_model(self, system_prompt: str, user_message: str) -> str:
+        """One blocking chat request to Ollama"""
+        payload = self._build_chat_payload(system_prompt, user_message, stream=False)
+        
+        # Make request to the least busy Ollama backend over its keep-alive pool
+        response = self.ollama.post("/api/chat", payload)
+        
+        if response.status_code != 200:
+            raise Exception(f"Ollama request failed: {response.status_code}")
+        result = response.json()
+        return result["message"]["content"].strip()
+    
+    def _stream_ai_response(self, system_prompt: str, user_message: str):
+        """Yield response text chunks from Ollama's streaming chat API
+        
+        Ollama streams newline-delimited JSON objects, each carrying the next
+        piece of `message.content`, until one arrives with `done: true`.
+        Errors are raised so the caller can decide what the user sees.
+        """
+        cache_key = self._get_cache_key(system_prompt, user_message)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        payload = self._build_chat_payload(system_prompt, user_message, stream=True)
+        chunks = []
+        # The breaker judges a stream by its time to first chunk, since long
+        # answers legitimately take a while to finish
+        self.breaker.before_call()
+        started = time.perf_counter()
+        first_chunk_seconds = None
+        failed = True
         try:
-            # Prepare the chat messages in Ollama format
-            payload = {
-                "model": self.model_name,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user", 
-                        "content": user_message
-                    }
-                ],
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 150,
-                    "stop": ["\n\n\n"]
-                }
-            }
-            
-            # Make request to Ollama with timeout
-            response = requests.post(
-                f"{self.ollama_url}/api/chat",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                ai_response = result["message"]["content"].strip()
-                
-                # Cache the response
-                self._response_cache[cache_key] = {
-                    'response': ai_response,
-                    'timestamp': current_time
-                }
-                
-                # Clean old cache entries
-                self._clean_cache()
-                
-                return ai_response
-            else:
-                raise Exception(f"Ollama request failed: {response.status_code}")
-                
-        except requests.RequestException as e:
-            return f"AI connection error: {str(e)}"
-        except Exception as e:
-            return f"AI processing error: {str(e)}"
-    
-    def _clean_cache(self):
-        """Remove expired cache entries"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, value in self._response_cache.items()
-            if current_time - value['timestamp'] > self._cache_ttl
-        ]
-        for key in expired_keys:
-            del self._response_cache[key]
-    
-    def test_ai_connection(self) -> bool:
-        """Test if we can connect to Ollama and the model"""
-        try:
-            # Simple test message
-            test_response = self._generate_ai_response(
-                "You are AdinavAI, a family AI assistant. Respond briefly.", 
-                "Hello, are you working?"
-            )
-            return "error" not in test_response.lower()
-        except:
-            return False
+            # The read timeout applies to each gap between chunks
+            with self.ollama.post("/api/chat", payload, stream=True) as response:
+                try:
+                    if response.status_code != 200:
+                        raise Exception(f"Ollama request failed: {response.status_code}")
+                    
+                    # No break on `done`: reading the body to its end returns the
+                    # connection to the pool instead of dropping it
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        data = json.loads(line)
+                        if data.get("error"):
+                            raise Exception(f"Ollama stream error: {data['error']}")
+                        chunk = data.get("message", {}).get("content", "")
+                        if chunk:
+                            if first_chunk_seconds is None:
+                                first_chunk_seconds = time.perf_counter() - started
+                            chunks.append(chunk)
+                            yield chunk
+                except Exception:
+                    # Client errors (4xx) are our fault, not a sign of a sick backend
+                    self.ollama.finish_stream(response, not 400 <= response.status_code < 500)
+                    raise
+                self.ollama.finish_stream(response, False)
+            failed = False
+        except GeneratorExit:
+            # The client went away; that says nothing about the model
+            failed = False
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.breaker.record(first_chunk_seconds if first_chunk_seconds is not None else elapsed, failed)
+        
+        ai_response = "".join(chunks).strip()
+        if ai_response:
+            self.response_cache.put(cache_key, ai_response)
+    
+    def test_ai_connection(self, refresh: bool = False) -> bool:
+        """Whether Ollama is up with our model installed
+        
+        Returns the cached health status without blocking; pass refresh=True
+        (e.g. at startup) to probe now and wait for the answer.
+        """
+        if refresh:
+            return self.health.refresh()['connected']
+        return self.health.is_connected()
+    
+    def get_ai_health(self) -> dict:
+        """Cached model status per backend; never blocks"""
+        return self.health.snapshot()
     
     def start_conversation(self, member_name: str) -> str:
         """Start a conversation with family member using AI"""
+        # The greeting request is the same every time, so the semantic cache
+        # (when enabled) serves recent starters within the member's freshness limit
+        greeting_request = f"Please greet {member_name.title()} warmly as AdinavAI. Ask them about their day or something relevant to their interests. Keep it brief and personal."
+        context_version = self.memory_agent.profile_version(member_name)
+        cached = self._semantic_lookup(member_name, greeting_request, context_version)
+        if cached is not None:
+            return cached
+        
         member_context = self.memory_agent.get_member_context(member_name)
         family_context = self.memory_agent.get_family_context()
         
         system_prompt = self._create_family_system_prompt(member_name, member_context, family_context)
         
         # Generate a personalized greeting
-        greeting_request = f"Please greet {member_name.title()} warmly as AdinavAI. Ask them about their day or something relevant to their interests. Keep it brief and personal."
-        
-        return self._generate_ai_response(system_prompt, greeting_request)
+        generation_started = time.perf_counter()
+        try:
+            greeting = self._generate_ai_response(system_prompt, greeting_request)
+        except Exception:
+            return self.fallback_agent.start_conversation(member_name)
+        self._semantic_store(member_name, greeting_request, greeting, context_version,
+                             time.perf_counter() - generation_started)
+        return greeting
 
 # Test function
 if __name__ == "__main__":
@@ -197,7 +381,7 @@ if __name__ == "__main__":
     ai_agent = AIPoweredFamilyChatAgent()
     
     # Test connection
-    if ai_agent.test_ai_connection():
+    if ai_agent.test_ai_connection(refresh=True):
         print("✓ AI connection successful!")
         
         # Test with Santosh
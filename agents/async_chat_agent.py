@@ -0,0 +1,302 @@
+"""
+AdinavAI Async Chat Agent
+asyncio variant of the AI chat agent for the ASGI serving path
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from ai_powered_chat_agent import AIPoweredFamilyChatAgent
+from single_flight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAIPoweredFamilyChatAgent:
+    """Talks to Ollama with aiohttp so a waiting chat costs a coroutine, not a thread.
+
+    It wraps a regular AIPoweredFamilyChatAgent and shares its memory agent,
+    prompt builder, caches and latency metrics, so both serving paths see
+    the same state. Only the model calls are async; memory and file work
+    (context building, remembering conversations, database writes) runs in
+    a small bounded thread pool, which caps how many threads the server
+    ever uses no matter how many chats are waiting on the model.
+    """
+
+    def __init__(self, agent: Optional[AIPoweredFamilyChatAgent] = None, max_workers: int = 4,
+                 max_connections: int = 32, connect_timeout: float = 3.05, read_timeout: float = 30.0):
+        self.agent = agent or AIPoweredFamilyChatAgent()
+        self.memory_agent = self.agent.memory_agent
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="adinav-io")
+        self.max_workers = max_workers
+        self.max_connections = max_connections
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.single_flight = AsyncSingleFlight()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the server's running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def run_blocking(self, fn, *args, **kwargs):
+        """Run file or database work in the bounded executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def _build_system_prompt(self, member_name: str, message: Optional[str]) -> str:
+        member_context = self.memory_agent.get_member_context(member_name, query=message)
+        family_context = self.memory_agent.get_family_context()
+        return self.agent._create_family_system_prompt(member_name, member_context, family_context)
+
+    async def _post(self, session: aiohttp.ClientSession, payload: Dict):
+        """POST to the router's least busy backend; returns (backend, response)
+
+        Like the blocking router, a request is only tried on another backend
+        when the connection itself was refused. The caller must release the
+        backend and the response.
+        """
+        router = self.agent.ollama
+        tried = []
+        while True:
+            backend = router.acquire(exclude=tried)
+            started = time.perf_counter()
+            try:
+                response = await session.post(f"{backend.url}/api/chat", json=payload)
+                return backend, started, response
+            except aiohttp.ClientConnectorError:
+                router.release(backend, time.perf_counter() - started, True)
+                tried.append(backend)
+                if len(tried) >= len(router.backends):
+                    raise
+            except BaseException:
+                router.release(backend, time.perf_counter() - started, True)
+                raise
+
+    def _track(self, delta: int):
+        self.in_flight += delta
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def _generate_ai_response(self, system_prompt: str, user_message: str) -> str:
+        """Async counterpart of AIPoweredFamilyChatAgent._generate_ai_response"""
+        cache_key = self.agent._get_cache_key(system_prompt, user_message)
+        cached = self.agent.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return await self.single_flight.do(cache_key, self._request_ai_response, system_prompt, user_message, cache_key)
+
+    async def _request_ai_response(self, system_prompt: str, user_message: str, cache_key: str) -> str:
+        """One upstream generation; concurrent identical requests await it
+
+        Failures are raised, and the shared circuit breaker sees every call.
+        """
+        breaker = self.agent.breaker
+        breaker.before_call()
+        session = await self._get_session()
+        payload = self.agent._build_chat_payload(system_prompt, user_message, stream=False)
+        self.requests += 1
+        self._track(1)
+        call_started = time.perf_counter()
+        try:
+            backend, started, response = await self._post(session, payload)
+            # Client errors (4xx) are our fault, not a sign of a sick backend
+            failed = response.status >= 500
+            try:
+                if response.status != 200:
+                    raise Exception(f"Ollama request failed: {response.status}")
+                result = await response.json(content_type=None)
+            finally:
+                response.release()
+                self.agent.ollama.release(backend, time.perf_counter() - started, failed)
+            ai_response = result["message"]["content"].strip()
+        except BaseException:
+            self.errors += 1
+            breaker.record(time.perf_counter() - call_started, True)
+            raise
+        finally:
+            self._track(-1)
+
+        breaker.record(time.perf_counter() - call_started, False)
+        self.agent.response_cache.put(cache_key, ai_response)
+        return ai_response
+
+    async def _stream_ai_response(self, system_prompt: str, user_message: str) -> AsyncIterator[str]:
+        """Yield response chunks from Ollama's streaming chat API; errors are raised"""
+        cache_key = self.agent._get_cache_key(system_prompt, user_message)
+        cached = self.agent.response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        breaker = self.agent.breaker
+        breaker.before_call()
+        session = await self._get_session()
+        payload = self.agent._build_chat_payload(system_prompt, user_message, stream=True)
+        chunks = []
+        self.requests += 1
+        self._track(1)
+        call_started = time.perf_counter()
+        first_chunk_seconds = None
+        failed = True
+        try:
+            backend, started, response = await self._post(session, payload)
+            # The backend's verdict: None if the client goes away mid-stream
+            backend_failed = True
+            try:
+                if response.status != 200:
+                    # Client errors (4xx) are our fault, not a sign of a sick backend
+                    backend_failed = response.status >= 500
+                    raise Exception(f"Ollama request failed: {response.status}")
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise Exception(f"Ollama stream error: {data['error']}")
+                    chunk = data.get("message", {}).get("content", "")
+                    if chunk:
+                        if first_chunk_seconds is None:
+                            first_chunk_seconds = time.perf_counter() - call_started
+                        chunks.append(chunk)
+                        yield chunk
+                backend_failed = False
+            except (GeneratorExit, asyncio.CancelledError):
+                backend_failed = None
+                raise
+            finally:
+                response.release()
+                seconds = None if backend_failed is None else time.perf_counter() - started
+                self.agent.ollama.release(backend, seconds, bool(backend_failed))
+            failed = False
+        except GeneratorExit:
+            # The client went away; that says nothing about the model
+            failed = False
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._track(-1)
+            elapsed = time.perf_counter() - call_started
+            breaker.record(first_chunk_seconds if first_chunk_seconds is not None else elapsed, failed)
+
+        ai_response = "".join(chunks).strip()
+        if ai_response:
+            self.agent.response_cache.put(cache_key, ai_response)
+
+    async def chat_with_family_member(self, member_name: str, message: str) -> str:
+        """Main chat function; same behaviour as the blocking agent"""
+        agent = self.agent
+        started = time.perf_counter()
+        try:
+            context_version = self.memory_agent.profile_version(member_name)
+            ai_response = agent._semantic_lookup(member_name, message, context_version)
+            if ai_response is None:
+                system_prompt = await self.run_blocking(self._build_system_prompt, member_name, message)
+                generation_started = time.perf_counter()
+                ai_response = await self._generate_ai_response(system_prompt, message)
+                agent._semantic_store(member_name, message, ai_response, context_version,
+                                      time.perf_counter() - generation_started)
+            path = 'blocking'
+        except Exception:
+            # Model failed, timed out or its circuit is open: use the rule-based reply
+            ai_response = await self.run_blocking(agent._fallback_response, member_name, message)
+            path = 'fallback'
+
+        elapsed = time.perf_counter() - started
+        agent.latency.record(path, elapsed, elapsed)
+
+        try:
+            await self.run_blocking(self.memory_agent.remember_conversation, member_name, message, ai_response,
+                                    fallback=path == 'fallback')
+        except Exception as e:
+            logger.error(f"Could not remember conversation: {e}")
+        return ai_response
+
+    async def chat_with_family_member_stream(self, member_name: str, message: str) -> AsyncIterator[str]:
+        """Streaming chat; the conversation is remembered after the last chunk"""
+        agent = self.agent
+        started = time.perf_counter()
+        first_chunk_at = None
+        chunks = []
+        context_version = self.memory_agent.profile_version(member_name)
+        cached = agent._semantic_lookup(member_name, message, context_version)
+        try:
+            if cached is not None:
+                first_chunk_at = time.perf_counter()
+                chunks.append(cached)
+                yield cached
+            else:
+                system_prompt = await self.run_blocking(self._build_system_prompt, member_name, message)
+                async for chunk in self._stream_ai_response(system_prompt, message):
+                    if first_chunk_at is None:
+                        first_chunk_at = time.perf_counter()
+                    chunks.append(chunk)
+                    yield chunk
+        except Exception:
+            if chunks:
+                # Part of the reply is already on screen; don't remember it half-finished
+                return
+            ai_response = await self.run_blocking(agent._fallback_response, member_name, message)
+            yield ai_response
+            finished = time.perf_counter()
+            agent.latency.record('fallback', finished - started, finished - started)
+            await self.run_blocking(agent._remember_stream, member_name, message, ai_response, fallback=True)
+            return
+
+        ai_response = "".join(chunks).strip()
+        finished = time.perf_counter()
+        agent.latency.record('stream', (first_chunk_at or finished) - started, finished - started)
+        if not ai_response:
+            return
+        if cached is None:
+            agent._semantic_store(member_name, message, ai_response, context_version, finished - started)
+        await self.run_blocking(agent._remember_stream, member_name, message, ai_response)
+
+    async def start_conversation(self, member_name: str) -> str:
+        """Async counterpart of AIPoweredFamilyChatAgent.start_conversation"""
+        agent = self.agent
+        greeting_request = f"Please greet {member_name.title()} warmly as AdinavAI. Ask them about their day or something relevant to their interests. Keep it brief and personal."
+        context_version = self.memory_agent.profile_version(member_name)
+        cached = agent._semantic_lookup(member_name, greeting_request, context_version)
+        if cached is not None:
+            return cached
+
+        system_prompt = await self.run_blocking(self._build_system_prompt, member_name, None)
+        generation_started = time.perf_counter()
+        try:
+            greeting = await self._generate_ai_response(system_prompt, greeting_request)
+        except Exception:
+            return agent.fallback_agent.start_conversation(member_name)
+        agent._semantic_store(member_name, greeting_request, greeting, context_version,
+                              time.perf_counter() - generation_started)
+        return greeting
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'io_workers': self.max_workers,
+            'max_connections': self.max_connections,
+            'single_flight': self.single_flight.get_stats()
+        }
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+        self.executor.shutdown(wait=False)
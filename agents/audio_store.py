@@ -0,0 +1,162 @@
+"""
+AdinavAI Audio Store
+Bounded storage for generated speech files, with a background sweeper
+"""
+
+import datetime
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AudioStore:
+    """Owns the files in one audio directory.
+
+    Every file gets a unique id (member, timestamp and a random suffix), so
+    two replies rendered in the same second no longer overwrite each other.
+    The store keeps the directory under `max_bytes` by deleting the oldest
+    files when new ones arrive, and a sweeper thread deletes files older
+    than `max_age_seconds`. A file that is being sent to a browser is
+    reference-counted and never deleted until the last response closes.
+    Files already in the directory at startup (including ones written
+    before the store existed) are adopted and aged out like the rest.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 100 * 1024 * 1024,
+                 max_age_seconds: float = 24 * 3600, sweep_interval: float = 600):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        # audio id -> (size, created), oldest first
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.bytes = 0
+        self.added = 0
+        self.swept = 0
+        self.quota_evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        files = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for created, audio_id, size in sorted(files):
+            self._files[audio_id] = (size, created)
+            self.bytes += size
+
+    def path(self, audio_id: str) -> str:
+        return os.path.join(self.root, audio_id)
+
+    def add(self, source_path: str, member: str, extension: str = "wav") -> str:
+        """Move a finished file into the store; returns its new audio id"""
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        audio_id = f"response_{member}_{stamp}_{uuid.uuid4().hex[:8]}.{extension}"
+        shutil.move(source_path, self.path(audio_id))
+        size = os.path.getsize(self.path(audio_id))
+        with self._lock:
+            self._files[audio_id] = (size, time.time())
+            self.bytes += size
+            self.added += 1
+            self._enforce_quota(keep=audio_id)
+        return audio_id
+
+    def acquire(self, audio_id: str) -> bool:
+        """Pin a file while it is served; False if the store doesn't have it"""
+        with self._lock:
+            if audio_id not in self._files:
+                return False
+            self._refs[audio_id] = self._refs.get(audio_id, 0) + 1
+            return True
+
+    def release(self, audio_id: str):
+        with self._lock:
+            remaining = self._refs.get(audio_id, 0) - 1
+            if remaining > 0:
+                self._refs[audio_id] = remaining
+            else:
+                self._refs.pop(audio_id, None)
+
+    def _delete(self, audio_id: str) -> bool:
+        # Caller holds the lock
+        size, _ = self._files[audio_id]
+        try:
+            os.remove(self.path(audio_id))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        del self._files[audio_id]
+        self.bytes -= size
+        return True
+
+    def _enforce_quota(self, keep: Optional[str] = None):
+        # Caller holds the lock; oldest unpinned files go first
+        if self.bytes <= self.max_bytes:
+            return
+        for audio_id in list(self._files):
+            if self.bytes <= self.max_bytes:
+                break
+            if audio_id == keep or self._refs.get(audio_id):
+                continue
+            if self._delete(audio_id):
+                self.quota_evictions += 1
+
+    def sweep(self) -> int:
+        """Delete unpinned files older than max_age_seconds; returns how many"""
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        with self._lock:
+            for audio_id, (_, created) in list(self._files.items()):
+                if created >= cutoff:
+                    break
+                if not self._refs.get(audio_id) and self._delete(audio_id):
+                    removed += 1
+            self.swept += removed
+        return removed
+
+    def start_sweeper(self):
+        """Sweep old files periodically in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="audio-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Audio sweep failed")
+            self._stop.wait(self.sweep_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            oldest = next(iter(self._files.values()), None)
+            return {
+                'files': len(self._files),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'in_use': len(self._refs),
+                'added': self.added,
+                'swept': self.swept,
+                'quota_evictions': self.quota_evictions,
+                'oldest_age_seconds': round(time.time() - oldest[1]) if oldest else None,
+                'max_age_seconds': self.max_age_seconds
+            }
@@ -0,0 +1,199 @@
+"""
+AdinavAI Audio Transcoder
+Compresses synthesized WAV speech with a locally installed encoder
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from latency_metrics import percentile
+
+# Output formats by preference; WAV needs no encoder and is always available
+FORMATS = {
+    'opus': {'mimetype': 'audio/ogg', 'extension': 'ogg', 'accept': ('audio/ogg', 'audio/opus')},
+    'mp3': {'mimetype': 'audio/mpeg', 'extension': 'mp3', 'accept': ('audio/mpeg', 'audio/mp3')},
+    'wav': {'mimetype': 'audio/wav', 'extension': 'wav', 'accept': ('audio/wav', 'audio/x-wav', 'audio/wave')},
+}
+PREFERENCE = ['opus', 'mp3', 'wav']
+
+
+def audio_format(filename: str) -> Optional[str]:
+    """Format name for an audio file name, from its extension"""
+    extension = filename.rsplit(".", 1)[-1].lower()
+    for fmt, spec in FORMATS.items():
+        if spec['extension'] == extension:
+            return fmt
+    return None
+
+
+def audio_mimetype(filename: str) -> str:
+    fmt = audio_format(filename)
+    return FORMATS[fmt]['mimetype'] if fmt else 'application/octet-stream'
+
+
+def _parse_accept(header: str) -> Dict[str, float]:
+    """Media types from an Accept header with their q values (parameters other than q ignored)"""
+    accepted = {}
+    for part in header.split(","):
+        fields = [field.strip() for field in part.split(";")]
+        media_type = fields[0].lower()
+        if not media_type:
+            continue
+        quality = 1.0
+        for field in fields[1:]:
+            if field.startswith("q="):
+                try:
+                    quality = float(field[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[media_type] = max(quality, accepted.get(media_type, 0.0))
+    return accepted
+
+
+class AudioTranscoder:
+    """Encodes WAV files to Ogg/Opus or MP3 in a small thread pool.
+
+    Encoders are found on the PATH at startup: ffmpeg (if built with
+    libopus / libmp3lame), opusenc and lame. The encoding itself runs in a
+    subprocess, so the pool's threads only wait. A client gets a compressed
+    format only if it names it in its Accept header; wildcards and clients
+    that name nothing we can encode get WAV.
+    """
+
+    def __init__(self, workers: int = 2, opus_bitrate_kbps: int = 24, mp3_bitrate_kbps: int = 48,
+                 window: int = 500):
+        self.opus_bitrate_kbps = opus_bitrate_kbps
+        self.mp3_bitrate_kbps = mp3_bitrate_kbps
+        self.encoders = self._find_encoders()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio-encode")
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._window = window
+
+    @staticmethod
+    def _find_encoders() -> Dict[str, str]:
+        """Format -> encoder name for every format we can produce"""
+        encoders = {}
+        ffmpeg = shutil.which("ffmpeg")
+        ffmpeg_encoders = ""
+        if ffmpeg:
+            try:
+                ffmpeg_encoders = subprocess.run(
+                    [ffmpeg, "-hide_banner", "-encoders"],
+                    capture_output=True, text=True, timeout=10
+                ).stdout
+            except (OSError, subprocess.SubprocessError):
+                pass
+        if "libopus" in ffmpeg_encoders:
+            encoders['opus'] = 'ffmpeg'
+        elif shutil.which("opusenc"):
+            encoders['opus'] = 'opusenc'
+        if "libmp3lame" in ffmpeg_encoders:
+            encoders['mp3'] = 'ffmpeg'
+        elif shutil.which("lame"):
+            encoders['mp3'] = 'lame'
+        return encoders
+
+    def available_formats(self) -> List[str]:
+        return [fmt for fmt in PREFERENCE if fmt == 'wav' or fmt in self.encoders]
+
+    def negotiate(self, accept_header: Optional[str]) -> str:
+        """Best format the client explicitly accepts and we can encode; WAV otherwise"""
+        accepted = _parse_accept(accept_header or "")
+        best, best_quality = 'wav', 0.0
+        for fmt in self.available_formats():
+            quality = max((accepted.get(media_type, 0.0) for media_type in FORMATS[fmt]['accept']), default=0.0)
+            # Ties go to the earlier, more compact format
+            if quality > best_quality:
+                best, best_quality = fmt, quality
+        return best
+
+    def settings(self, fmt: str) -> Dict[str, Any]:
+        """Everything that shapes the encoded bytes (part of the TTS cache key)"""
+        if fmt == 'opus':
+            return {'format': 'opus', 'encoder': self.encoders.get('opus'), 'bitrate_kbps': self.opus_bitrate_kbps}
+        if fmt == 'mp3':
+            return {'format': 'mp3', 'encoder': self.encoders.get('mp3'), 'bitrate_kbps': self.mp3_bitrate_kbps}
+        return {'format': 'wav'}
+
+    def _command(self, fmt: str, source: str, target: str) -> List[str]:
+        encoder = self.encoders[fmt]
+        if encoder == 'ffmpeg':
+            codec = ['-c:a', 'libopus', '-b:a', f'{self.opus_bitrate_kbps}k', '-application', 'voip'] \
+                if fmt == 'opus' else ['-c:a', 'libmp3lame', '-b:a', f'{self.mp3_bitrate_kbps}k']
+            return ['ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error', '-y', '-i', source, *codec, target]
+        if encoder == 'opusenc':
+            return ['opusenc', '--quiet', '--speech', '--bitrate', str(self.opus_bitrate_kbps), source, target]
+        return ['lame', '--quiet', '-b', str(self.mp3_bitrate_kbps), source, target]
+
+    def transcode(self, source: str, fmt: str, target: str) -> Future:
+        """Encode the WAV file `source` into `target`; the Future resolves to `target`"""
+        return self.executor.submit(self._encode, source, fmt, target)
+
+    def _encode(self, source: str, fmt: str, target: str) -> str:
+        with wave.open(source, "rb") as wav:
+            audio_seconds = wav.getnframes() / float(wav.getframerate() or 1)
+        started = time.perf_counter()
+        result = subprocess.run(self._command(fmt, source, target), capture_output=True, timeout=120)
+        if result.returncode != 0:
+            raise RuntimeError(f"{self.encoders[fmt]} failed: {result.stderr.decode(errors='replace').strip()}")
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            stats = self._format_stats(fmt)
+            stats['files'] += 1
+            stats['wav_bytes'] += os.path.getsize(source)
+            stats['encoded_bytes'] += os.path.getsize(target)
+            stats['audio_seconds'] += audio_seconds
+            if audio_seconds > 0:
+                stats['ms_per_audio_second'].append(elapsed * 1000 / audio_seconds)
+        return target
+
+    def _format_stats(self, fmt: str) -> Dict[str, Any]:
+        # Caller holds the lock
+        if fmt not in self._stats:
+            self._stats[fmt] = {
+                'files': 0, 'wav_bytes': 0, 'encoded_bytes': 0, 'audio_seconds': 0.0,
+                'ms_per_audio_second': deque(maxlen=self._window), 'served': 0, 'served_bytes': 0
+            }
+        return self._stats[fmt]
+
+    def record_served(self, fmt: str, size: int):
+        """Count bytes sent to clients per format"""
+        with self._lock:
+            stats = self._format_stats(fmt)
+            stats['served'] += 1
+            stats['served_bytes'] += size
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            formats = {}
+            for fmt, stats in self._stats.items():
+                p50 = percentile(stats['ms_per_audio_second'], 0.5)
+                formats[fmt] = {
+                    'files_encoded': stats['files'],
+                    'compression_ratio': round(stats['wav_bytes'] / stats['encoded_bytes'], 2)
+                    if stats['encoded_bytes'] else None,
+                    'encoded_bytes_per_audio_second': round(stats['encoded_bytes'] / stats['audio_seconds'])
+                    if stats['audio_seconds'] else None,
+                    'encode_ms_per_audio_second_p50': round(p50, 1) if p50 is not None else None,
+                    'responses': stats['served'],
+                    'bytes_sent': stats['served_bytes']
+                }
+            return {
+                'encoders': dict(self.encoders),
+                'formats_available': self.available_formats(),
+                'workers': self.workers,
+                'formats': formats
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,129 @@
+"""
+AdinavAI Circuit Breaker
+Stops calling the model while it is failing or too slow, and probes for recovery
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+from latency_metrics import percentile
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the model while the breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed -> open -> half-open breaker over a rolling window of outcomes.
+
+    While closed, every call's outcome and duration go into a window of the
+    last `window` calls. Once it holds at least `min_calls`, the breaker
+    opens if the failure rate reaches `failure_rate` or the 95th percentile
+    duration reaches `slow_call_seconds`. While open, calls are rejected
+    immediately. After `open_seconds` the breaker half-opens and lets
+    `half_open_calls` trial calls through: a success closes it with a fresh
+    window, a failure (or a slow call) opens it again.
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 20.0, open_seconds: float = 30.0, half_open_calls: int = 1):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_trip_reason = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trial_calls = 0
+        return self._state
+
+    def _open(self, now: float, reason: str):
+        self._state = OPEN
+        self._opened_at = now
+        self.times_opened += 1
+        self.last_trip_reason = reason
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go ahead now"""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == OPEN or (state == HALF_OPEN and self._trial_calls >= self.half_open_calls):
+                self.rejected += 1
+                raise CircuitOpenError(f"Model circuit is {state}")
+            if state == HALF_OPEN:
+                self._trial_calls += 1
+
+    def record(self, seconds: float, failed: bool):
+        """Record the outcome of a call that before_call() let through"""
+        now = time.monotonic()
+        slow = seconds >= self.slow_call_seconds
+        with self._lock:
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                if failed or slow:
+                    self._open(now, "trial call failed" if failed else "trial call too slow")
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                return
+            if state == OPEN:
+                return
+
+            self._outcomes.append((seconds, failed))
+            if len(self._outcomes) < self.min_calls:
+                return
+            failures = sum(1 for _, f in self._outcomes if f)
+            p95 = percentile((s for s, _ in self._outcomes), 0.95)
+            if failures / len(self._outcomes) >= self.failure_rate:
+                self._open(now, f"{failures}/{len(self._outcomes)} calls failed")
+            elif p95 >= self.slow_call_seconds:
+                self._open(now, f"p95 latency {p95:.1f}s")
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn` through the breaker; exceptions count as failures and propagate"""
+        self.before_call()
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            self.record(time.perf_counter() - started, True)
+            raise
+        self.record(time.perf_counter() - started, False)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            failures = sum(1 for _, f in self._outcomes if f)
+            return {
+                'state': state,
+                'window_calls': len(self._outcomes),
+                'window_failure_rate': round(failures / len(self._outcomes), 4) if self._outcomes else 0.0,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'last_trip_reason': self.last_trip_reason,
+                'retry_in_seconds': round(max(self.open_seconds - (time.monotonic() - self._opened_at), 0), 1)
+                if state == OPEN else 0
+            }
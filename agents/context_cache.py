@@ -0,0 +1,67 @@
+"""
+AdinavAI Context Cache
+Versioned cache for the member and family context strings used in prompts
+"""
+
+import threading
+from typing import Any, Callable, Dict
+
+
+class ContextCache:
+    """Caches built strings per key, invalidated by bumping the key's version.
+
+    A value is reused for as long as its key's version is unchanged. A
+    mutation to one member bumps only that member's version, so every other
+    member's cached context stays valid. A key may hold several variants
+    (e.g. contexts with a different number of recent conversations); they
+    share the key's version and are invalidated together.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[tuple, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def invalidate(self, key: str):
+        """Mark the cached value for `key` as stale"""
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            for entry_key in [k for k in self._entries if k[0] == key]:
+                del self._entries[entry_key]
+            self.invalidations += 1
+
+    def get(self, key: str, build: Callable[[], str], variant: Any = None) -> str:
+        """Return the cached value for `key` (and `variant`), building it on a miss"""
+        with self._lock:
+            version = self._versions.get(key, 0)
+            entry = self._entries.get((key, variant))
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = build()
+
+        with self._lock:
+            # Only store if nothing changed while we were building
+            if self._versions.get(key, 0) == version:
+                self._entries[(key, variant)] = (version, value)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries)
+            }
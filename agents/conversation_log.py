@@ -0,0 +1,183 @@
+"""
+AdinavAI Conversation Log
+Append-only JSON Lines store for the family's daily conversations
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class ConversationLog:
+    """Append-only log with one JSON object per line.
+
+    Appending a conversation costs one short write regardless of how much
+    history is already on disk. The fsync policy controls durability:
+
+    - "always":   fsync after every append (safest, slowest)
+    - "interval": fsync at most once every `fsync_interval` seconds
+    - "never":    leave flushing to the operating system
+
+    Pass a `process_lock` (see file_locking.InterProcessLock) when several
+    server processes append to the same file.
+    """
+
+    def __init__(self, path: str, fsync_policy: str = "interval", fsync_interval: float = 1.0,
+                 process_lock=None):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.path = path
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._process_lock = process_lock or contextlib.nullcontext()
+        self._file = None
+        self._last_fsync = 0.0
+        self._dirty = False
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def append(self, entry: Dict) -> Tuple[int, int]:
+        """Append one entry and return the byte offsets where its line starts and ends"""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock, self._process_lock:
+            f = self._open()
+            offset = f.seek(0, os.SEEK_END)
+            f.write(line)
+            f.flush()
+            self._dirty = True
+            self._maybe_fsync(f)
+        return offset, offset + len(line)
+
+    def _maybe_fsync(self, f):
+        if self.fsync_policy == "always":
+            os.fsync(f.fileno())
+            self._dirty = False
+        elif self.fsync_policy == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(f.fileno())
+                self._last_fsync = now
+                self._dirty = False
+
+    def sync(self):
+        """Force pending appends to disk"""
+        with self._lock:
+            if self._file is not None and self._dirty:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._last_fsync = time.monotonic()
+                self._dirty = False
+
+    def close(self):
+        """Sync and close the underlying file"""
+        self.sync()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """Stream entries from disk one line at a time"""
+        for _, _, entry in self.iter_entries_with_offsets():
+            yield entry
+
+    def iter_entries_with_offsets(self, start: int = 0) -> Iterator[Tuple[int, int, Dict]]:
+        """Stream (start offset, end offset, entry) from disk, beginning at byte `start`"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                line_offset = offset
+                offset += len(line)
+                if not line.endswith(b"\n"):
+                    # Partially written last line - skip it
+                    break
+                try:
+                    yield line_offset, offset, json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def read_at(self, offset: int) -> Optional[Dict]:
+        """Read the entry starting at a byte offset returned by append()"""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def migrate_from_json_array(self, array_path: str, backup_suffix: str = ".migrated") -> int:
+        """One-time import of a legacy JSON array file into this log.
+
+        Entries are appended in order, then the legacy file is renamed with
+        `backup_suffix` so the migration never runs twice. Returns the number
+        of entries migrated.
+        """
+        if not os.path.exists(array_path):
+            return 0
+
+        count = 0
+        with self._lock, self._process_lock:
+            f = self._open()
+            for entry in iter_json_array(array_path):
+                f.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(array_path, array_path + backup_suffix)
+        return count
+
+
+def iter_json_array(path: str, chunk_size: int = 65536) -> Iterator[Dict]:
+    """Yield the items of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        started = False
+        eof = False
+        while True:
+            if not eof and len(buffer) < chunk_size:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    return
+                if buffer[0] != "[":
+                    raise ValueError(f"{path} does not contain a JSON array")
+                buffer = buffer[1:]
+                started = True
+                continue
+
+            buffer = buffer.lstrip(", \t\r\n")
+            if buffer.startswith("]") or (eof and not buffer):
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Item spans past the buffer - read more and retry
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+
+            yield item
+            buffer = buffer[end:]
@@ -8,8 +8,9 @@ import random
 from family_memory_agent import FamilyMemoryAgent
 
 class FamilyChatAgent:
-    def __init__(self):
-        self.memory_agent = FamilyMemoryAgent()
+    def __init__(self, memory_agent=None):
+        # The AI agent passes its own memory agent when using this as its fallback
+        self.memory_agent = memory_agent or FamilyMemoryAgent()
         self.conversation_starters = {
             "santosh": [
                 "How was your day with AI and technology exploration?",
@@ -124,8 +125,9 @@ class FamilyChatAgent:
         if member_data.get("interests"):
             memories.append(f"I remember you like: {', '.join(member_data['interests'])}")
         
-        if member_data.get("conversation_history"):
-            recent_topics = [conv["message"][:50] for conv in member_data["conversation_history"][-3:]]
+        recent_conversations = self.memory_agent.get_recent_conversations(member_name, 3)
+        if recent_conversations:
+            recent_topics = [conv["message"][:50] for conv in recent_conversations]
             memories.append(f"We recently talked about: {', '.join(recent_topics)}")
         
         if memories:
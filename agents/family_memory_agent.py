@@ -3,21 +3,109 @@ AdinavAI Family Memory Agent
 Remembers everything about our family - conversations, preferences, memories
 """
 
+import atexit
+import contextlib
+import copy
 import json
 import datetime
 import os
-from typing import Dict, List, Any
+import threading
+from typing import Dict, List, Any, Tuple
+from conversation_log import ConversationLog
+from write_coalescer import WriteCoalescer
+from history_store import MemberHistoryStore
+from file_locking import InterProcessLock, atomic_write_json
+from context_cache import ContextCache
+from search_index import ConversationSearchIndex
+from interest_matcher import InterestMatcher
+from semantic_retriever import ConversationRetriever
+from history_compactor import HistoryCompactor
+from personality_observations import PersonalityObservations, split_legacy_personality
+
+# Cache key for the family-wide context; member names are lowercase usernames
+FAMILY_CONTEXT_KEY = "__family__"
 
 class FamilyMemoryAgent:
-    def __init__(self, data_path=None):
+    def __init__(self, data_path=None, fsync_policy=None, process_lock=None):
         if data_path is None:
             # Get the directory where the script is located, then go up one level
             current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             data_path = os.path.join(current_dir, "family_data")
         self.data_path = data_path
         self.family_file = os.path.join(data_path, "family_members.json")
-        self.conversations_file = os.path.join(data_path, "daily_conversations.json")
-        self.family_data = self.load_family_data()
+        self.conversations_file = os.path.join(data_path, "daily_conversations.jsonl")
+        self.legacy_conversations_file = os.path.join(data_path, "daily_conversations.json")
+        self.interest_matcher = InterestMatcher.from_file(os.path.join(data_path, "interest_vocabulary.json"))
+        
+        # One lock per member so different members never wait on each other
+        self._member_locks: Dict[str, threading.RLock] = {}
+        self._member_locks_guard = threading.Lock()
+        self._dirty_members = set()
+        self._dirty_guard = threading.Lock()
+        
+        # Prompt context strings, invalidated per member on mutation
+        self.context_cache = ContextCache()
+        # Bumped only when what we know about a member changes (interests,
+        # personality, summaries), not on every remembered conversation
+        self._profile_versions: Dict[str, int] = {}
+        
+        # Optional cross-process lock so several server workers can share family_data
+        if process_lock is None:
+            process_lock = os.environ.get("FAMILY_DATA_PROCESS_LOCK", "").lower() in ("1", "true", "yes")
+        self.shared_data_dir = process_lock
+        if process_lock:
+            self.process_lock = InterProcessLock(os.path.join(data_path, ".family_data.lock"))
+        else:
+            self.process_lock = contextlib.nullcontext()
+        
+        self.history = MemberHistoryStore(os.path.join(data_path, "history"), shared=self.shared_data_dir)
+        # With a shared data dir: each member's history fingerprint as last seen,
+        # so appends by other workers invalidate this worker's cached context
+        self._history_states: Dict[str, tuple] = {}
+        with self.process_lock:
+            self.family_data = self.load_family_data()
+            migrated_history = self.migrate_conversation_history()
+            migrated_personality = self.migrate_personality_observations()
+            if migrated_history or migrated_personality:
+                self.save_family_data_dict(self.family_data)
+        
+        # Coalesce profile writes: many mutations, one flush
+        self.persistence = WriteCoalescer(self._write_family_data)
+        
+        # Append-only daily conversation log (one JSON object per line)
+        if fsync_policy is None:
+            fsync_policy = os.environ.get("CONVERSATION_LOG_FSYNC", "interval")
+        self.conversation_log = ConversationLog(
+            self.conversations_file,
+            fsync_policy=fsync_policy,
+            process_lock=self.process_lock if self.shared_data_dir else None
+        )
+        with self.process_lock:
+            if not os.path.exists(self.conversations_file):
+                self.conversation_log.migrate_from_json_array(self.legacy_conversations_file)
+        atexit.register(self.conversation_log.close)
+        
+        # Full-text search over the daily log, built on first search
+        self.search_index = ConversationSearchIndex(self.conversation_log)
+        
+        # Relevance-based recall of past conversations for prompts
+        self.retriever = ConversationRetriever(self.history)
+        
+        # Rolls old history into summaries; started by the server, not here
+        self.compactor = HistoryCompactor(
+            self,
+            max_age_days=int(os.environ.get("HISTORY_COMPACTION_MAX_AGE_DAYS", 30)),
+            period=os.environ.get("HISTORY_COMPACTION_PERIOD", "week")
+        )
+    
+    def member_lock(self, member_name: str) -> threading.RLock:
+        """Get the lock guarding one member's profile and history"""
+        member_name = member_name.lower()
+        with self._member_locks_guard:
+            lock = self._member_locks.get(member_name)
+            if lock is None:
+                lock = self._member_locks[member_name] = threading.RLock()
+            return lock
     
     def load_family_data(self) -> Dict:
         """Load family data from JSON file"""
@@ -33,13 +121,127 @@ class FamilyMemoryAgent:
         except (FileNotFoundError, json.JSONDecodeError):
             return self.create_initial_family_data()
     
-    def save_family_data(self):
-        """Save family data to JSON file"""
-        with open(self.family_file, 'w', encoding='utf-8') as f:
-            json.dump(self.family_data, f, indent=2, ensure_ascii=False)
+    def migrate_conversation_history(self) -> bool:
+        """Move inline conversation_history lists into the per-member history store"""
+        migrated = False
+        for member_name, member in self.family_data.get("members", {}).items():
+            if "conversation_history" not in member:
+                continue
+            history = member.pop("conversation_history")
+            # A previous run may have copied the history before it could rewrite the profile file
+            if history and not self.history.has_history(member_name):
+                self.history.append_many(member_name, history)
+            migrated = True
+        
+        return migrated
+    
+    def migrate_personality_observations(self) -> bool:
+        """Turn appended ' | <date>: <note>' personality suffixes into bounded observations"""
+        migrated = False
+        for member in self.family_data.get("members", {}).values():
+            base, legacy = split_legacy_personality(member.get("personality", ""))
+            if not legacy:
+                continue
+            member["personality"] = base
+            observations = PersonalityObservations.for_member(member)
+            for date, note in legacy:
+                observations.add(note, date)
+            migrated = True
+        
+        return migrated
+    
+    def save_family_data(self, member_name: str = None):
+        """Mark family data as changed; the coalescer decides when to write
+        
+        Must not be called while holding a member lock.
+        """
+        with self._dirty_guard:
+            if member_name is None:
+                self._dirty_members.update(self.family_data["members"].keys())
+            else:
+                self._dirty_members.add(member_name.lower())
+        self.persistence.mark_dirty()
+    
+    def _snapshot_family_data(self) -> Dict:
+        """Copy family data, taking each member's lock while copying it"""
+        snapshot = {key: copy.deepcopy(value) for key, value in self.family_data.items() if key != "members"}
+        snapshot["members"] = {}
+        for member_name in list(self.family_data["members"].keys()):
+            with self.member_lock(member_name):
+                snapshot["members"][member_name] = copy.deepcopy(self.family_data["members"][member_name])
+        return snapshot
+    
+    def _write_family_data(self):
+        """Atomically replace the family data JSON file"""
+        with self._dirty_guard:
+            dirty_members, self._dirty_members = self._dirty_members, set()
+        
+        # Member locks are always taken before the process lock, never inside it
+        data = self._snapshot_family_data()
+        try:
+            with self.process_lock:
+                adopted = self._merge_other_workers_changes(data, dirty_members) if self.shared_data_dir else {}
+                atomic_write_json(self.family_file, data)
+        except Exception:
+            with self._dirty_guard:
+                self._dirty_members.update(dirty_members)
+            raise
+        
+        for member_name, member in adopted.items():
+            with self.member_lock(member_name):
+                with self._dirty_guard:
+                    changed_since_snapshot = member_name in self._dirty_members
+                if not changed_since_snapshot:
+                    self.family_data["members"][member_name] = member
+                    self.profile_changed(member_name)
+        if adopted:
+            self.context_cache.invalidate(FAMILY_CONTEXT_KEY)
+    
+    def _merge_other_workers_changes(self, data: Dict, dirty_members: set) -> Dict:
+        """Keep members changed by other processes that this process did not touch"""
+        try:
+            with open(self.family_file, 'r', encoding='utf-8') as f:
+                on_disk = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        
+        adopted = {}
+        for member_name, member in on_disk.get("members", {}).items():
+            if member_name in dirty_members:
+                continue
+            data["members"][member_name] = member
+            adopted[member_name] = copy.deepcopy(member)
+        return adopted
+    
+    def flush(self):
+        """Write any pending family data and sync the conversation log"""
+        self.persistence.flush()
+        self.conversation_log.sync()
+    
+    def start_background_compaction(self):
+        """Start the low-priority history compaction thread"""
+        self.compactor.start()
     
-    def remember_conversation(self, member_name: str, message: str, ai_response: str):
-        """Remember a conversation with a family member"""
+    def get_compaction_report(self) -> Dict:
+        """Bytes and prompt tokens saved by history compaction"""
+        return self.compactor.get_report()
+    
+    def close(self):
+        """Flush everything on clean shutdown"""
+        self.compactor.stop()
+        self.persistence.close()
+        self.conversation_log.close()
+    
+    def get_persistence_stats(self) -> Dict:
+        """Mutation vs flush counters for family_members.json"""
+        return self.persistence.get_stats()
+    
+    def remember_conversation(self, member_name: str, message: str, ai_response: str, fallback: bool = False):
+        """Remember a conversation with a family member
+        
+        `fallback` marks a canned reply given while the model was unavailable.
+        The turn is still logged, but retrieval and search leave it out.
+        """
         timestamp = datetime.datetime.now().isoformat()
         
         conversation_entry = {
@@ -49,79 +251,161 @@ class FamilyMemoryAgent:
             "ai_response": ai_response,
             "day": datetime.datetime.now().strftime("%Y-%m-%d")
         }
+        if fallback:
+            conversation_entry["fallback"] = True
         
         # Add to member's conversation history
         if member_name.lower() in self.family_data["members"]:
-            self.family_data["members"][member_name.lower()]["conversation_history"].append(conversation_entry)
+            with self.member_lock(member_name), self.process_lock:
+                changed_elsewhere = self._history_changed_elsewhere(member_name)
+                self.history.append(member_name.lower(), conversation_entry)
+                if self.shared_data_dir:
+                    self._history_states[member_name.lower()] = self.history.state(member_name.lower())
+                self.context_cache.invalidate(member_name.lower())
+            if changed_elsewhere:
+                self.retriever.forget(member_name)
+            else:
+                self.retriever.add(member_name, conversation_entry)
         
-        # Save daily conversations
-        self.save_daily_conversation(conversation_entry)
-        self.save_family_data()
+        # Save daily conversations and keep the search index current
+        log_offset, log_end = self.save_daily_conversation(conversation_entry)
+        self.search_index.add(log_offset, log_end, conversation_entry)
         
-        # Learn from the conversation
+        # Learn from the conversation (marks family data dirty once)
         self.learn_from_conversation(member_name.lower(), message)
     
-    def save_daily_conversation(self, conversation_entry: Dict):
-        """Save conversation to daily log"""
-        try:
-            with open(self.conversations_file, 'r', encoding='utf-8') as f:
-                daily_conversations = json.load(f)
-        except FileNotFoundError:
-            daily_conversations = []
-        
-        daily_conversations.append(conversation_entry)
-        
-        with open(self.conversations_file, 'w', encoding='utf-8') as f:
-            json.dump(daily_conversations, f, indent=2, ensure_ascii=False)
+    def save_daily_conversation(self, conversation_entry: Dict) -> Tuple[int, int]:
+        """Append conversation to the daily log, returning its start and end log offsets"""
+        return self.conversation_log.append(conversation_entry)
+    
+    def iter_daily_conversations(self):
+        """Stream every logged conversation without loading the whole log"""
+        return self.conversation_log.iter_entries()
+    
+    def search_conversations(self, query: str, member_name: str = None, page: int = 1, per_page: int = 10) -> Dict:
+        """Ranked full-text search over logged conversations"""
+        return self.search_index.search(query, member=member_name, page=page, per_page=per_page)
     
     def learn_from_conversation(self, member_name: str, message: str):
         """Learn about family member from their message"""
         message_lower = message.lower()
         
         # Simple learning patterns - we'll make this smarter over time
-        if "like" in message_lower or "love" in message_lower:
-            # Extract interests
-            self.extract_interests(member_name, message)
+        with self.member_lock(member_name):
+            if "like" in message_lower or "love" in message_lower:
+                # Extract interests
+                self.extract_interests(member_name, message)
+            
+            if "feel" in message_lower or "think" in message_lower:
+                # Extract personality traits
+                self.extract_personality_traits(member_name, message)
         
-        if "feel" in message_lower or "think" in message_lower:
-            # Extract personality traits
-            self.extract_personality_traits(member_name, message)
-        
-        # Always save what we learn
-        self.save_family_data()
+        # Always save what we learn (coalesced with other pending changes)
+        self.save_family_data(member_name)
     
     def extract_interests(self, member_name: str, message: str):
         """Extract interests from conversation"""
         interests = self.family_data["members"][member_name].get("interests", [])
         
-        # Simple keyword extraction - we'll improve this
-        keywords = ["football", "cricket", "reading", "games", "music", "art", "science", "math"]
-        for keyword in keywords:
-            if keyword in message.lower() and keyword not in interests:
-                interests.append(keyword)
+        # Vocabulary and synonyms come from family_data/interest_vocabulary.json
+        added = False
+        for interest in self.interest_matcher.match(message):
+            if interest not in interests:
+                interests.append(interest)
+                added = True
         
         self.family_data["members"][member_name]["interests"] = interests
+        if added:
+            self.profile_changed(member_name)
     
     def extract_personality_traits(self, member_name: str, message: str):
         """Extract personality traits from conversation"""
         # This will become more sophisticated with AI
-        current_personality = self.family_data["members"][member_name].get("personality", "")
-        
-        # For now, just append new observations
+        # For now, record a bounded, deduplicated observation
         if len(message) > 20:  # Meaningful message
-            self.family_data["members"][member_name]["personality"] = current_personality + f" | {datetime.date.today()}: observed from conversation"
+            observations = PersonalityObservations.for_member(self.family_data["members"][member_name])
+            observations.observe_message(message)
+            self.profile_changed(member_name)
+    
+    def profile_changed(self, member_name: str):
+        """Note a change to a member's profile and drop their cached context"""
+        member_name = member_name.lower()
+        with self.member_lock(member_name):
+            self._profile_versions[member_name] = self._profile_versions.get(member_name, 0) + 1
+        self.context_cache.invalidate(member_name)
     
-    def get_member_context(self, member_name: str) -> str:
-        """Get everything we know about a family member"""
-        member = self.family_data["members"].get(member_name.lower(), {})
+    def profile_version(self, member_name: str) -> int:
+        """Counter of profile changes; cached answers older than a few are stale"""
+        with self.member_lock(member_name):
+            return self._profile_versions.get(member_name.lower(), 0)
+    
+    def _history_changed_elsewhere(self, member_name: str) -> bool:
+        """With a shared data dir, whether the member's history changed on disk
+        since this process last looked (another worker appended or compacted)"""
+        if not self.shared_data_dir:
+            return False
+        member_name = member_name.lower()
+        state = self.history.state(member_name)
+        with self.member_lock(member_name):
+            changed = self._history_states.get(member_name) != state
+            self._history_states[member_name] = state
+        return changed
+    
+    def _sync_shared_history(self, member_name: str):
+        """Invalidate cached context and retrieval data made stale by other workers"""
+        if self._history_changed_elsewhere(member_name):
+            self.context_cache.invalidate(member_name.lower())
+            self.retriever.forget(member_name)
+    
+    def get_member_context(self, member_name: str, query: str = None) -> str:
+        """Get everything we know about a family member
+        
+        Without a query the last 5 conversations are included. With a query
+        (the message being answered) only the last 2 are kept for continuity
+        and the past exchanges most relevant to the query are added instead.
+        The profile part is cached until the member changes.
+        """
+        self._sync_shared_history(member_name)
+        if query is None:
+            return self.context_cache.get(member_name.lower(), lambda: self._build_member_context(member_name, 5), variant=5)
+        
+        context = self.context_cache.get(member_name.lower(), lambda: self._build_member_context(member_name, 2), variant=2)
+        relevant_conversations = self.get_relevant_conversations(member_name, query, exclude_last=2)
+        if relevant_conversations:
+            context += "\nRelevant past conversations:\n"
+            for conv in relevant_conversations:
+                context += f"- {conv['timestamp'][:10]}: {conv['message'][:150]} -> {conv['ai_response'][:150]}\n"
+        return context
+    
+    def get_relevant_conversations(self, member_name: str, query: str, limit: int = 3,
+                                   token_budget: int = 200, exclude_last: int = 0) -> List[Dict]:
+        """Past exchanges most similar to `query`, best first, within a prompt token budget"""
+        if member_name.lower() not in self.family_data["members"]:
+            return []
+        self._sync_shared_history(member_name)
+        return self.retriever.top_k(member_name, query, k=limit, token_budget=token_budget, exclude_last=exclude_last)
+    
+    def _build_member_context(self, member_name: str, recent_count: int) -> str:
+        with self.member_lock(member_name):
+            member = copy.deepcopy(self.family_data["members"].get(member_name.lower(), {}))
         
         context = f"Family Member: {member.get('name', member_name)}\n"
         context += f"Role: {member.get('role', 'unknown')}\n"
         context += f"Interests: {', '.join(member.get('interests', []))}\n"
         context += f"Personality: {member.get('personality', 'learning...')}\n"
+        observation_summary = PersonalityObservations.for_member(member).summary()
+        if observation_summary:
+            context += f"Observations: {observation_summary}\n"
+        
+        # Older history, compacted into period summaries
+        summaries = self.history.load_summaries(member_name.lower())
+        if summaries:
+            context += "\nEarlier conversations (summarized):\n"
+            for period in sorted(summaries)[-2:]:
+                context += f"- {period}: {summaries[period]['summary']}\n"
         
         # Recent conversations
-        recent_conversations = member.get("conversation_history", [])[-5:]  # Last 5 conversations
+        recent_conversations = self.get_recent_conversations(member_name, recent_count)
         if recent_conversations:
             context += "\nRecent conversations:\n"
             for conv in recent_conversations:
@@ -129,8 +413,16 @@ class FamilyMemoryAgent:
         
         return context
     
+    def get_recent_conversations(self, member_name: str, limit: int = 5) -> List[Dict]:
+        """Get a member's most recent conversations, oldest first"""
+        with self.member_lock(member_name):
+            return self.history.tail(member_name.lower(), limit)
+    
     def get_family_context(self) -> str:
-        """Get overall family context"""
+        """Get overall family context (cached)"""
+        return self.context_cache.get(FAMILY_CONTEXT_KEY, self._build_family_context)
+    
+    def _build_family_context(self) -> str:
         family_info = self.family_data["family"]
         context = f"Family: {family_info['name']}\n"
         context += f"Family Values: {', '.join(family_info['values'])}\n"
@@ -138,6 +430,10 @@ class FamilyMemoryAgent:
         
         return context
     
+    def get_context_cache_stats(self) -> Dict:
+        """Hit/miss counters for the prompt context cache"""
+        return self.context_cache.get_stats()
+    
     def create_initial_family_data(self) -> Dict:
         """Create initial family data structure"""
         initial_data = {
@@ -150,43 +446,37 @@ class FamilyMemoryAgent:
                     "name": "Santosh Gupta",
                     "role": "admin",
                     "interests": [],
-                    "personality": "Family creator and administrator",
-                    "conversation_history": []
+                    "personality": "Family creator and administrator"
                 },
                 "maryne": {
                     "name": "Maryne Gupta",
                     "role": "mother",
                     "interests": [],
-                    "personality": "Caring mother",
-                    "conversation_history": []
+                    "personality": "Caring mother"
                 },
                 "aditya": {
                     "name": "Aditya Gupta",
                     "role": "son",
                     "interests": [],
-                    "personality": "Young family member",
-                    "conversation_history": []
+                    "personality": "Young family member"
                 },
                 "avinav": {
                     "name": "Avinav Gupta",
                     "role": "son",
                     "interests": [],
-                    "personality": "Young family member",
-                    "conversation_history": []
+                    "personality": "Young family member"
                 },
                 "sushma": {
                     "name": "Sushma Potlapally",
                     "role": "sister",
                     "interests": [],
-                    "personality": "Visiting from Germany",
-                    "conversation_history": []
+                    "personality": "Visiting from Germany"
                 },
                 "meghna": {
                     "name": "Meghna Potlapally",
                     "role": "niece",
                     "interests": [],
-                    "personality": "Sushma's daughter",
-                    "conversation_history": []
+                    "personality": "Sushma's daughter"
                 }
             }
         }
@@ -197,9 +487,7 @@ class FamilyMemoryAgent:
     
     def save_family_data_dict(self, data: Dict):
         """Save family data dictionary to file"""
-        os.makedirs(self.data_path, exist_ok=True)
-        with open(self.family_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        atomic_write_json(self.family_file, data)
 
 # Simple test
 if __name__ == "__main__":
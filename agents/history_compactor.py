@@ -0,0 +1,212 @@
+"""
+AdinavAI History Compactor
+Rolls old conversation history into weekly or monthly summaries
+"""
+
+import datetime
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from file_locking import atomic_write_json
+from search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# What the member context puts in a prompt from raw history: the last few
+# messages, each cut to a snippet (see FamilyMemoryAgent._build_member_context)
+PROMPT_RECENT_CONVERSATIONS = 5
+PROMPT_SNIPPET_CHARS = 100
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Chatty words that make poor topics
+TOPIC_STOPWORDS = frozenset(
+    "about also been can't could don't does going i'm into just know like more not okay please "
+    "really some tell than that's then there thing think very want what's would yeah yes yourself".split()
+)
+
+
+def extractive_summary(entries: List[Dict], previous: str = "", max_sentences: int = 3,
+                       max_chars: int = 400) -> str:
+    """Local summarizer: main topics plus the most representative sentences.
+
+    When a period already has a summary, the older text keeps at most half
+    of the `max_chars` budget so the result stays bounded.
+    """
+    sentences = []
+    for entry in entries:
+        sentences.extend(s.strip() for s in SENTENCE_SPLIT.split(entry.get("message", "")) if len(s.strip()) > 15)
+
+    frequencies: Dict[str, int] = {}
+    for sentence in sentences:
+        for token in set(tokenize(sentence)):
+            frequencies[token] = frequencies.get(token, 0) + 1
+
+    def score(sentence: str) -> float:
+        tokens = set(tokenize(sentence))
+        return sum(frequencies[t] for t in tokens) / (len(tokens) + 1)
+
+    candidates = [t for t in frequencies if len(t) > 3 and t not in TOPIC_STOPWORDS]
+    topics = sorted(candidates, key=lambda token: (-frequencies[token], token))[:5]
+    highlights = sorted(sentences, key=score, reverse=True)[:max_sentences]
+
+    parts = []
+    if topics:
+        parts.append(f"Talked about {', '.join(topics)}.")
+    if highlights:
+        parts.append("Highlights: " + " / ".join(h[:100] for h in highlights))
+    summary = " ".join(parts)
+
+    if previous:
+        budget = max_chars // 2
+        previous = previous if len(previous) <= budget else previous[:budget - 3] + "..."
+        summary = f"{previous} {summary}"
+    return summary if len(summary) <= max_chars else summary[:max_chars - 3] + "..."
+
+
+class HistoryCompactor:
+    """Background job that condenses member history older than `max_age_days`.
+
+    Whole segments whose newest entry is older than the cutoff are grouped
+    into ISO weeks or calendar months, summarized into the member's
+    summaries.json and moved to gzip cold storage. The active (newest)
+    segment is never touched. Each summary records which segments it covers
+    and a checkpoint file records the running totals, so an interrupted run
+    resumes without summarizing anything twice. The job sleeps between
+    segments to stay out of the way of chat requests.
+    """
+
+    def __init__(self, memory_agent, max_age_days: int = 30, period: str = "week",
+                 summarize_fn: Optional[Callable[[List[Dict], str], str]] = None,
+                 pause_seconds: float = 0.2, interval_seconds: float = 6 * 3600):
+        if period not in ("week", "month"):
+            raise ValueError(f"Unknown compaction period: {period}")
+        self.memory_agent = memory_agent
+        self.history = memory_agent.history
+        self.max_age_days = max_age_days
+        self.period = period
+        self.summarize_fn = summarize_fn or extractive_summary
+        self.pause_seconds = pause_seconds
+        self.interval_seconds = interval_seconds
+        self.checkpoint_file = os.path.join(self.history.root, "compaction_checkpoint.json")
+        self._stop = threading.Event()
+        self._thread = None
+        self._run_lock = threading.Lock()
+        self.report = self._load_checkpoint().get("totals", self._empty_totals())
+
+    @staticmethod
+    def _empty_totals() -> Dict[str, Any]:
+        return {
+            'segments_compacted': 0,
+            'conversations_compacted': 0,
+            'raw_bytes': 0,
+            'cold_bytes': 0,
+            'summary_bytes': 0,
+            'bytes_saved': 0,
+            'prompt_tokens_saved': 0,
+            'last_run': None
+        }
+
+    def _load_checkpoint(self) -> Dict:
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _period_key(self, timestamp: str) -> str:
+        day = datetime.date.fromisoformat(timestamp[:10])
+        if self.period == "month":
+            return f"{day.year}-{day.month:02d}"
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+
+    def start(self):
+        """Run compaction periodically in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="history-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("History compaction failed")
+            self._stop.wait(self.interval_seconds)
+
+    def run_once(self) -> Dict[str, Any]:
+        """Compact every member once and return the cumulative report"""
+        with self._run_lock:
+            cutoff = (datetime.datetime.now() - datetime.timedelta(days=self.max_age_days)).isoformat()
+            for member in self.history.members():
+                for path in self.history.segment_paths(member)[:-1]:
+                    if self._stop.is_set():
+                        break
+                    if not self._compact_segment(member, path, cutoff):
+                        # Segments are in time order; later ones are newer still
+                        break
+                    self.report['last_run'] = datetime.datetime.now().isoformat()
+                    atomic_write_json(self.checkpoint_file, {"totals": self.report})
+                    time.sleep(self.pause_seconds)
+
+            return dict(self.report)
+
+    def _compact_segment(self, member: str, path: str, cutoff: str) -> bool:
+        entries = self.history.read_segment(path)
+        if entries and entries[-1].get("timestamp", "") >= cutoff:
+            return False
+
+        name = os.path.basename(path)
+        summaries = self.history.load_summaries(member)
+        summary_bytes_before = len(json.dumps(summaries))
+        groups: Dict[str, List[Dict]] = {}
+        for entry in entries:
+            groups.setdefault(self._period_key(entry.get("timestamp", "1970-01-01")), []).append(entry)
+
+        summary_tokens = 0
+        for period, group in groups.items():
+            record = summaries.get(period, {"period": period, "conversations": 0, "summary": "", "segments": []})
+            if name in record["segments"]:
+                continue  # Summarized before a crash; only the archive step is left
+            record["summary"] = self.summarize_fn(group, record["summary"])
+            record["conversations"] += len(group)
+            record["segments"].append(name)
+            summaries[period] = record
+            summary_tokens += len(record["summary"]) // 4
+
+        with self.memory_agent.member_lock(member), self.memory_agent.process_lock:
+            # Only the newest few messages ever reached the prompt as snippets
+            in_prompt = {
+                (entry.get("timestamp"), entry.get("message")) for entry in
+                self.history.tail(member, PROMPT_RECENT_CONVERSATIONS)
+            }
+            self.history.save_summaries(member, summaries)
+            raw_bytes = os.path.getsize(path)
+            cold_bytes = self.history.archive_segment(member, path)
+        self.memory_agent.profile_changed(member)
+
+        summary_bytes = len(json.dumps(summaries)) - summary_bytes_before
+        prompt_tokens = sum(
+            len(entry.get("message", "")[:PROMPT_SNIPPET_CHARS]) for entry in entries
+            if (entry.get("timestamp"), entry.get("message")) in in_prompt
+        ) // 4
+        self.report['segments_compacted'] += 1
+        self.report['conversations_compacted'] += len(entries)
+        self.report['raw_bytes'] += raw_bytes
+        self.report['cold_bytes'] += cold_bytes
+        self.report['summary_bytes'] += summary_bytes
+        self.report['bytes_saved'] += raw_bytes - cold_bytes - summary_bytes
+        self.report['prompt_tokens_saved'] += max(prompt_tokens - summary_tokens, 0)
+        return True
+
+    def get_report(self) -> Dict[str, Any]:
+        return dict(self.report)
@@ -0,0 +1,187 @@
+"""
+AdinavAI Member History Store
+Keeps each family member's conversation history in small JSONL segments
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+from typing import Dict, Iterator, List
+
+from file_locking import atomic_write_json
+
+SEGMENT_PATTERN = re.compile(r"^segment_(\d+)\.jsonl$")
+
+
+class MemberHistoryStore:
+    """Per-member conversation history split into fixed-size segment files.
+
+    Layout: <root>/<member>/segment_000001.jsonl, segment_000002.jsonl, ...
+    New entries go to the newest segment; a new segment is started once the
+    current one holds `segment_size` entries. Tail reads walk segments from
+    newest to oldest and stop as soon as enough entries are found, so older
+    segments are never opened.
+
+    Compacted segments are moved to <root>/<member>/cold/ as gzip files and
+    replaced by period summaries in <root>/<member>/summaries.json.
+
+    With `shared=True` the segment listing is re-read on every operation so
+    appends made by other processes are picked up.
+    """
+
+    def __init__(self, root: str, segment_size: int = 200, shared: bool = False):
+        self.root = root
+        self.segment_size = segment_size
+        self.shared = shared
+        # member -> [segment numbers], and entry count of the newest segment
+        self._segments: Dict[str, List[int]] = {}
+        self._current_count: Dict[str, int] = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _member_dir(self, member: str) -> str:
+        return os.path.join(self.root, member.lower())
+
+    def _segment_path(self, member: str, number: int) -> str:
+        return os.path.join(self._member_dir(member), f"segment_{number:06d}.jsonl")
+
+    def _load_segments(self, member: str) -> List[int]:
+        member = member.lower()
+        if self.shared or member not in self._segments:
+            numbers = []
+            member_dir = self._member_dir(member)
+            if os.path.isdir(member_dir):
+                for name in os.listdir(member_dir):
+                    match = SEGMENT_PATTERN.match(name)
+                    if match:
+                        numbers.append(int(match.group(1)))
+            numbers.sort()
+            self._segments[member] = numbers
+            self._current_count[member] = (
+                self._count_lines(self._segment_path(member, numbers[-1])) if numbers else 0
+            )
+        return self._segments[member]
+
+    @staticmethod
+    def _count_lines(path: str) -> int:
+        with open(path, "rb") as f:
+            return sum(1 for line in f if line.endswith(b"\n"))
+
+    def members(self) -> List[str]:
+        """Members that have stored history"""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def segment_paths(self, member: str) -> List[str]:
+        """Segment files for a member, oldest first"""
+        return [self._segment_path(member, n) for n in self._load_segments(member)]
+
+    def state(self, member: str) -> tuple:
+        """Cheap fingerprint of a member's history on disk.
+
+        Changes whenever an entry is appended, a segment is archived or the
+        summaries are rewritten, by this process or any other.
+        """
+        segments = self._load_segments(member)
+        fingerprint = [len(segments), segments[-1] if segments else 0]
+        paths = [self._summaries_path(member)]
+        if segments:
+            paths.append(self._segment_path(member, segments[-1]))
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                fingerprint += [stat.st_size, stat.st_mtime_ns]
+            except FileNotFoundError:
+                fingerprint += [0, 0]
+        return tuple(fingerprint)
+
+    def has_history(self, member: str) -> bool:
+        return bool(self._load_segments(member))
+
+    def append(self, member: str, entry: Dict):
+        """Append one conversation entry to the member's newest segment"""
+        self.append_many(member, [entry])
+
+    def append_many(self, member: str, entries: List[Dict]):
+        """Append several entries, rolling over segments as they fill up"""
+        member = member.lower()
+        segments = self._load_segments(member)
+        os.makedirs(self._member_dir(member), exist_ok=True)
+
+        pending = list(entries)
+        while pending:
+            if not segments or self._current_count[member] >= self.segment_size:
+                segments.append(segments[-1] + 1 if segments else 1)
+                self._current_count[member] = 0
+            room = self.segment_size - self._current_count[member]
+            batch, pending = pending[:room], pending[room:]
+            with open(self._segment_path(member, segments[-1]), "a", encoding="utf-8") as f:
+                for entry in batch:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._current_count[member] += len(batch)
+
+    def tail(self, member: str, n: int) -> List[Dict]:
+        """Last `n` entries, oldest first, without parsing older segments"""
+        if n <= 0:
+            return []
+        collected: List[Dict] = []
+        for number in reversed(self._load_segments(member)):
+            with open(self._segment_path(member, number), "rb") as f:
+                lines = [line for line in f.readlines() if line.endswith(b"\n")]
+            needed = n - len(collected)
+            collected = [json.loads(line) for line in lines[-needed:]] + collected
+            if len(collected) >= n:
+                break
+        return collected
+
+    def iter_entries(self, member: str) -> Iterator[Dict]:
+        """Stream all entries for a member, oldest first"""
+        for number in list(self._load_segments(member)):
+            with open(self._segment_path(member, number), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        yield json.loads(line)
+
+    def read_segment(self, path: str) -> List[Dict]:
+        """All complete entries of one segment file"""
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.endswith("\n")]
+
+    def archive_segment(self, member: str, path: str) -> int:
+        """Gzip a hot segment into the member's cold storage and remove it.
+
+        Returns the size of the compressed file. Safe to repeat after a crash:
+        an existing archive is overwritten.
+        """
+        member = member.lower()
+        cold_dir = os.path.join(self._member_dir(member), "cold")
+        os.makedirs(cold_dir, exist_ok=True)
+        cold_path = os.path.join(cold_dir, os.path.basename(path) + ".gz")
+        temp_path = cold_path + ".tmp"
+        with open(path, "rb") as source, gzip.open(temp_path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.replace(temp_path, cold_path)
+        os.remove(path)
+
+        number = int(SEGMENT_PATTERN.match(os.path.basename(path)).group(1))
+        segments = self._load_segments(member)
+        if number in segments:
+            segments.remove(number)
+        return os.path.getsize(cold_path)
+
+    def _summaries_path(self, member: str) -> str:
+        return os.path.join(self._member_dir(member), "summaries.json")
+
+    def load_summaries(self, member: str) -> Dict[str, Dict]:
+        """Period -> summary record for compacted history"""
+        try:
+            with open(self._summaries_path(member), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save_summaries(self, member: str, summaries: Dict[str, Dict]):
+        atomic_write_json(self._summaries_path(member), summaries)
@@ -0,0 +1,116 @@
+"""
+AdinavAI Interest Matcher
+Finds every known interest in a message in one pass over its words
+"""
+
+import json
+import re
+from typing import Dict, List, Union
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Used when family_data/interest_vocabulary.json is missing
+DEFAULT_VOCABULARY = {
+    "football": ["football", "soccer"],
+    "cricket": ["cricket"],
+    "reading": ["reading", "books", "novels"],
+    "games": ["games", "gaming", "video games"],
+    "music": ["music", "songs", "singing"],
+    "art": ["art", "drawing", "painting"],
+    "science": ["science"],
+    "math": ["math", "maths", "mathematics"],
+}
+
+# Phrases that say the member likes what follows ("I love", "I'm into"...)
+LIKING_CUES = [
+    "i love", "i like", "i enjoy", "i really love", "i really like", "i really enjoy",
+    "i'm into", "im into", "i am into", "i'm interested in", "i am interested in",
+    "my favourite", "my favorite", "my hobby is", "fan of", "passionate about",
+    "love learning", "like learning", "enjoy learning", "love playing", "like playing", "enjoy playing"
+]
+# How many words may separate a liking cue from a liked-only term
+CUE_WINDOW = 3
+
+_TERMINAL = object()
+_CUE = object()
+
+
+class InterestMatcher:
+    """Word-level trie over a vocabulary of interests and their synonyms.
+
+    Every phrase (one or more words) maps to a canonical interest. Matching
+    tokenizes the message once and walks the trie from each word, so the
+    cost depends on the message length, not the vocabulary size, and
+    matches always fall on word boundaries ("art" does not match "party").
+
+    A vocabulary value is either a list of phrases (the interest name
+    itself matches too) or {"terms": [...], "liked_terms": [...]}. Liked
+    terms are words too common to count on their own ("ai" in "Hi AI",
+    "space", "german"); they only match within a few words after a liking
+    cue such as "I love" or "I'm into". In the dict form the interest name
+    only matches if it is listed.
+    """
+
+    def __init__(self, vocabulary: Dict[str, Union[List[str], Dict[str, List[str]]]]):
+        self._trie: Dict = {}
+        self.term_count = 0
+        for interest, synonyms in vocabulary.items():
+            if isinstance(synonyms, dict):
+                for phrase in synonyms.get("terms", []):
+                    self._add_phrase(phrase, (interest, False))
+                for phrase in synonyms.get("liked_terms", []):
+                    self._add_phrase(phrase, (interest, True))
+            else:
+                for phrase in [interest] + list(synonyms):
+                    self._add_phrase(phrase, (interest, False))
+        for cue in LIKING_CUES:
+            node = self._trie
+            for word in WORD_PATTERN.findall(cue):
+                node = node.setdefault(word, {})
+            node[_CUE] = True
+
+    @classmethod
+    def from_file(cls, path: str) -> "InterestMatcher":
+        """Load {interest: [synonyms...]} from JSON, falling back to the defaults"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            return cls(DEFAULT_VOCABULARY)
+
+    def _add_phrase(self, phrase: str, terminal: tuple):
+        """Map a phrase to (interest, liked_only)"""
+        words = WORD_PATTERN.findall(phrase.lower())
+        if not words:
+            return
+        node = self._trie
+        for word in words:
+            node = node.setdefault(word, {})
+        if _TERMINAL not in node:
+            self.term_count += 1
+        node[_TERMINAL] = terminal
+
+    def match(self, message: str) -> List[str]:
+        """Canonical interests mentioned in the message, in order of first mention"""
+        words = WORD_PATTERN.findall(message.lower())
+        found: Dict[str, None] = {}
+        trie = self._trie
+        # Word position just after the latest liking cue
+        cue_end = None
+        for start in range(len(words)):
+            node = trie.get(words[start])
+            position = start + 1
+            liked = cue_end is not None and 0 <= start - cue_end <= CUE_WINDOW
+            while node is not None:
+                if _CUE in node:
+                    cue_end = max(cue_end or 0, position)
+                terminal = node.get(_TERMINAL)
+                if terminal is not None:
+                    interest, liked_only = terminal
+                    if liked or not liked_only:
+                        found[interest] = None
+                if position == len(words):
+                    break
+                node = node.get(words[position])
+                position += 1
+        return list(found)
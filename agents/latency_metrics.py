@@ -0,0 +1,64 @@
+"""
+AdinavAI Latency Metrics
+Time-to-first-token and total latency per chat path
+"""
+
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+
+def percentile(values: Iterable[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of `values` (None when there are none)"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def percentile_ms(values: Iterable[float], fraction: float) -> Optional[float]:
+    """percentile() of durations in seconds, as milliseconds rounded to 0.1"""
+    value = percentile(values, fraction)
+    return None if value is None else round(value * 1000, 1)
+
+
+class LatencyMetrics:
+    """Keeps the last `window` samples per path and reports percentiles.
+
+    Each sample is a (ttft, total) pair in seconds. For the blocking path
+    the first token only reaches the browser with the whole reply, so its
+    TTFT equals its total latency.
+    """
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, path: str, ttft: float, total: float):
+        with self._lock:
+            samples = self._samples.get(path)
+            if samples is None:
+                samples = self._samples[path] = deque(maxlen=self.window)
+            samples.append((ttft, total))
+            self._counts[path] = self._counts.get(path, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per path: request count and p50/p95 TTFT and total latency in ms"""
+        with self._lock:
+            snapshot = {path: list(samples) for path, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        stats = {}
+        for path, samples in snapshot.items():
+            ttfts = [sample[0] for sample in samples]
+            totals = [sample[1] for sample in samples]
+            stats[path] = {
+                'requests': counts[path],
+                'ttft_p50_ms': percentile_ms(ttfts, 0.5),
+                'ttft_p95_ms': percentile_ms(ttfts, 0.95),
+                'total_p50_ms': percentile_ms(totals, 0.5),
+                'total_p95_ms': percentile_ms(totals, 0.95)
+            }
+        return stats
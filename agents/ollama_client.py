@@ -0,0 +1,180 @@
+"""
+AdinavAI Ollama Client
+Shared keep-alive HTTP client for every call to the local Ollama server
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from latency_metrics import percentile_ms
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+RETRYABLE_STATUS = (502, 503, 504)
+
+
+class OllamaClient:
+    """One pooled requests.Session per Ollama server.
+
+    Connections are kept alive and reused across threads (up to
+    `pool_maxsize` at once), with separate connect and read timeouts so a
+    dead server fails fast while a long generation is still allowed to
+    finish. Only idempotent GET probes are retried, with exponential
+    backoff; POSTs to the model are never replayed, since that would run a
+    second generation.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_OLLAMA_URL, pool_maxsize: int = 16,
+                 connect_timeout: float = 3.05, read_timeout: float = 30.0,
+                 probe_retries: int = 2, backoff_factor: float = 0.3, window: int = 500):
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.probe_retries = probe_retries
+        self.backoff_factor = backoff_factor
+
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount(self.base_url, self.adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self._window = window
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+
+    def _record(self, path: str, seconds: float, failed: bool):
+        with self._lock:
+            samples = self._latencies.get(path)
+            if samples is None:
+                samples = self._latencies[path] = deque(maxlen=self._window)
+            samples.append(seconds)
+            self.requests += 1
+            if failed:
+                self.errors += 1
+
+    def post(self, path: str, payload: Dict, stream: bool = False,
+             read_timeout: Optional[float] = None) -> requests.Response:
+        """POST JSON to the model; never retried
+
+        For streamed responses the recorded latency is the time until the
+        response headers arrive; the caller must close the response.
+        """
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.post(
+                f"{self.base_url}{path}",
+                json=payload,
+                stream=stream,
+                timeout=(self.connect_timeout, read_timeout or self.read_timeout)
+            )
+            failed = response.status_code >= 400
+            return response
+        finally:
+            self._record(path, time.perf_counter() - started, failed)
+
+    def get(self, path: str, timeout: Optional[float] = None,
+            retries: Optional[int] = None) -> requests.Response:
+        """GET a probe endpoint, retrying connection errors and 5xx with backoff"""
+        retries = self.probe_retries if retries is None else retries
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.get(
+                    f"{self.base_url}{path}",
+                    timeout=(self.connect_timeout, timeout or self.read_timeout)
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(path, time.perf_counter() - started, True)
+                if attempt >= retries:
+                    raise
+            else:
+                failed = response.status_code >= 400
+                self._record(path, time.perf_counter() - started, failed)
+                if response.status_code not in RETRYABLE_STATUS or attempt >= retries:
+                    return response
+                response.close()
+
+            with self._lock:
+                self.retries += 1
+            time.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+
+    def is_available(self, timeout: float = 3, retries: Optional[int] = None) -> bool:
+        """True if the server answers /api/tags"""
+        try:
+            return self.get("/api/tags", timeout=timeout, retries=retries).status_code == 200
+        except requests.RequestException:
+            return False
+
+    def list_models(self, timeout: float = 5) -> List[str]:
+        """Names of the locally available models (empty if unreachable)"""
+        try:
+            response = self.get("/api/tags", timeout=timeout)
+            if response.status_code == 200:
+                return [model.get("name", "") for model in response.json().get("models", [])]
+        except (requests.RequestException, ValueError):
+            pass
+        return []
+
+    def _pool_counters(self) -> Dict[str, int]:
+        """Totals over the adapter's urllib3 pools (one per host/TLS setting)"""
+        pools = self.adapter.poolmanager.pools
+        opened = requests_sent = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return {
+            'connections_opened': opened,
+            'pool_requests': requests_sent
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        pool = self._pool_counters()
+        with self._lock:
+            latencies = {path: list(samples) for path, samples in self._latencies.items()}
+            stats = {
+                'base_url': self.base_url,
+                'requests': self.requests,
+                'errors': self.errors,
+                'retries': self.retries
+            }
+        stats.update(pool)
+        reused = pool['pool_requests'] - pool['connections_opened']
+        stats['connection_reuse_rate'] = round(reused / pool['pool_requests'], 4) if pool['pool_requests'] else 0.0
+        stats['latency_ms'] = {
+            path: {
+                'p50': percentile_ms(samples, 0.5),
+                'p95': percentile_ms(samples, 0.95)
+            }
+            for path, samples in latencies.items() if samples
+        }
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+_clients: Dict[str, OllamaClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_ollama_client(base_url: Optional[str] = None) -> OllamaClient:
+    """The process-wide client for `base_url` (default: $OLLAMA_URL or localhost)"""
+    base_url = (base_url or os.environ.get("OLLAMA_URL") or DEFAULT_OLLAMA_URL).rstrip("/")
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = _clients[base_url] = OllamaClient(base_url)
+        return client
@@ -0,0 +1,263 @@
+"""
+AdinavAI Ollama Router
+Spreads model requests over several Ollama servers and steers around sick ones
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError
+
+from ollama_client import DEFAULT_OLLAMA_URL, OllamaClient, get_ollama_client
+
+
+def _is_connect_failure(error: Exception) -> bool:
+    """True if the request never reached the server, so sending it elsewhere is safe"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        reason = error.args[0]
+        if isinstance(reason, MaxRetryError):
+            reason = reason.reason
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+    return False
+
+
+class Backend:
+    """One Ollama server with its load and health bookkeeping"""
+
+    def __init__(self, client: OllamaClient):
+        self.client = client
+        self.url = client.base_url
+        self.outstanding = 0
+        self.ewma_seconds: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.requests = 0
+        self.errors = 0
+        self.completed = deque()
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class OllamaRouter:
+    """Least-outstanding-requests routing over several Ollama backends.
+
+    Each request goes to the available backend with the fewest requests in
+    flight, ties broken by the lower latency EWMA. The EWMA is fed with
+    whole-request times, from sending the request until the last byte of
+    the answer, for blocking and streamed requests alike. Health is tracked
+    passively: `eject_after` consecutive failures eject a backend for
+    `eject_seconds`, after which it gets traffic again and is re-ejected if
+    it keeps failing. A background thread also probes every backend's
+    /api/tags and counts a failed probe like a failed request. An answered
+    probe only shows the server is up, not that it can generate, so it
+    neither cuts an ejection short nor clears the failure count. Generation
+    requests are only re-sent to another backend when the first one refused
+    the connection, i.e. never started work.
+
+    The router offers the same post/get/is_available/list_models/get_stats
+    interface as OllamaClient, plus acquire/release for the asyncio agent
+    and finish_stream for consumers of streamed responses.
+    """
+
+    def __init__(self, urls: Sequence[str], eject_after: int = 3, eject_seconds: float = 30.0,
+                 probe_interval: float = 10.0, ewma_alpha: float = 0.3):
+        if not urls:
+            raise ValueError("At least one Ollama URL is required")
+        self.backends = [Backend(get_ollama_client(url)) for url in urls]
+        self.base_url = self.backends[0].url
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.probe_interval = probe_interval
+        self.ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._probe_thread = None
+
+    # Routing
+
+    def acquire(self, exclude: Sequence[Backend] = ()) -> Backend:
+        """Pick a backend for one request and count it as outstanding"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends if b.available(now) and b not in exclude]
+            if not candidates:
+                # Everything is ejected: try whichever comes back soonest
+                remaining = [b for b in self.backends if b not in exclude] or self.backends
+                candidates = [min(remaining, key=lambda b: b.ejected_until)]
+            backend = min(candidates, key=lambda b: (b.outstanding, b.ewma_seconds or 0.0))
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def release(self, backend: Backend, seconds: Optional[float], failed: bool):
+        """Record the outcome of a request started with acquire()
+
+        `seconds` is None for a request abandoned by our side (e.g. the
+        client went away mid-stream): it is no longer outstanding, but says
+        nothing about the backend's health or latency.
+        """
+        now = time.monotonic()
+        with self._lock:
+            backend.outstanding -= 1
+            if seconds is None:
+                return
+            if failed:
+                backend.errors += 1
+                self._record_failure(backend, now)
+                return
+            backend.consecutive_failures = 0
+            if backend.ewma_seconds is None:
+                backend.ewma_seconds = seconds
+            else:
+                backend.ewma_seconds += self.ewma_alpha * (seconds - backend.ewma_seconds)
+            backend.completed.append(now)
+            while backend.completed and now - backend.completed[0] > 60:
+                backend.completed.popleft()
+
+    def _record_failure(self, backend: Backend, now: float):
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.eject_after and backend.available(now):
+            backend.ejected_until = now + self.eject_seconds
+            backend.ejections += 1
+
+    # OllamaClient interface
+
+    def post(self, path: str, payload: Dict, stream: bool = False,
+             read_timeout: Optional[float] = None) -> requests.Response:
+        tried: List[Backend] = []
+        while True:
+            backend = self.acquire(exclude=tried)
+            started = time.perf_counter()
+            try:
+                response = backend.client.post(path, payload, stream=stream, read_timeout=read_timeout)
+            except requests.RequestException as e:
+                self.release(backend, time.perf_counter() - started, True)
+                tried.append(backend)
+                if _is_connect_failure(e) and len(tried) < len(self.backends):
+                    continue
+                raise
+
+            failed = response.status_code >= 500
+            if not stream or failed:
+                self.release(backend, time.perf_counter() - started, failed)
+                return response
+
+            # Streams stay outstanding until the consumer reports how they
+            # ended with finish_stream(); closing the response without that
+            # releases the backend without a verdict
+            close = response.close
+            released = []
+
+            def release_backend(failed: Optional[bool]):
+                if not released:
+                    released.append(True)
+                    seconds = None if failed is None else time.perf_counter() - started
+                    self.release(backend, seconds, bool(failed))
+
+            def close_and_release():
+                try:
+                    close()
+                finally:
+                    release_backend(None)
+
+            response.release_backend = release_backend
+            response.close = close_and_release
+            return response
+
+    def finish_stream(self, response: requests.Response, failed: bool):
+        """Record how a streamed response from post() ended; call before closing it"""
+        release_backend = getattr(response, "release_backend", None)
+        if release_backend is not None:
+            release_backend(failed)
+
+    def get(self, path: str, timeout: Optional[float] = None,
+            retries: Optional[int] = None) -> requests.Response:
+        backend = self.acquire()
+        started = time.perf_counter()
+        try:
+            response = backend.client.get(path, timeout=timeout, retries=retries)
+        except requests.RequestException:
+            self.release(backend, time.perf_counter() - started, True)
+            raise
+        self.release(backend, time.perf_counter() - started, response.status_code >= 500)
+        return response
+
+    def is_available(self, timeout: float = 3, retries: Optional[int] = None) -> bool:
+        """True if any backend answers /api/tags"""
+        return any(b.client.is_available(timeout=timeout, retries=retries) for b in self.backends)
+
+    def list_models(self, timeout: float = 5) -> List[str]:
+        models: Dict[str, None] = {}
+        for backend in self.backends:
+            for name in backend.client.list_models(timeout=timeout):
+                models[name] = None
+        return list(models)
+
+    # Active health checks
+
+    def start(self):
+        """Probe every backend's /api/tags in a daemon thread"""
+        if self._probe_thread is not None:
+            return
+        self._probe_thread = threading.Thread(target=self._probe_loop, name="ollama-probes", daemon=True)
+        self._probe_thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def probe_once(self):
+        for backend in self.backends:
+            if not backend.client.is_available(timeout=2, retries=0):
+                with self._lock:
+                    self._record_failure(backend, time.monotonic())
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            self.probe_once()
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            backends = [{
+                'url': b.url,
+                'healthy': b.available(now),
+                'outstanding': b.outstanding,
+                'requests': b.requests,
+                'errors': b.errors,
+                'ejections': b.ejections,
+                'latency_ewma_ms': round(b.ewma_seconds * 1000, 1) if b.ewma_seconds is not None else None,
+                'requests_last_minute': sum(1 for t in b.completed if now - t <= 60)
+            } for b in self.backends]
+        return {
+            'backends': backends,
+            'clients': [b.client.get_stats() for b in self.backends]
+        }
+
+
+_routers: Dict[tuple, OllamaRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_ollama_router(urls: Optional[Sequence[str]] = None) -> OllamaRouter:
+    """The process-wide router for `urls` (default: $OLLAMA_URLS, else $OLLAMA_URL or localhost)"""
+    if not urls:
+        configured = os.environ.get("OLLAMA_URLS", "")
+        urls = [u.strip() for u in configured.split(",") if u.strip()]
+    if not urls:
+        urls = [os.environ.get("OLLAMA_URL") or DEFAULT_OLLAMA_URL]
+    key = tuple(url.rstrip("/") for url in urls)
+    with _routers_lock:
+        router = _routers.get(key)
+        if router is None:
+            router = _routers[key] = OllamaRouter(key)
+            if len(key) > 1:
+                router.start()
+        return router
@@ -0,0 +1,92 @@
+"""
+AdinavAI Personality Observations
+Bounded, deduplicated record of what we notice about each family member
+"""
+
+import datetime
+from typing import Dict, List, Tuple
+
+# Message cue -> observation note
+OBSERVATION_CUES = {
+    "feel": "shares feelings",
+    "think": "shares opinions",
+}
+DEFAULT_NOTE = "observed from conversation"
+
+
+class PersonalityObservations:
+    """Date-bucketed observation counts stored on a member profile.
+
+    Observations live in the profile as a JSON-friendly list of
+    {"date", "note", "count"} records. Repeats of the same note on the same
+    day merge into one record, and only the newest `max_entries` records are
+    kept. summary() renders a fixed-size line for the LLM prompt.
+    """
+
+    def __init__(self, records: List[Dict], max_entries: int = 30, summary_notes: int = 3,
+                 summary_chars: int = 160):
+        self.records = records
+        self.max_entries = max_entries
+        self.summary_notes = summary_notes
+        self.summary_chars = summary_chars
+
+    @classmethod
+    def for_member(cls, member: Dict) -> "PersonalityObservations":
+        return cls(member.setdefault("observations", []))
+
+    def add(self, note: str, date: str = None):
+        """Record one observation, merging repeats within the same day"""
+        date = date or datetime.date.today().isoformat()
+        for record in self.records:
+            if record["date"] == date and record["note"] == note:
+                record["count"] += 1
+                return
+
+        self.records.append({"date": date, "note": note, "count": 1})
+        self.records.sort(key=lambda record: record["date"])
+        if len(self.records) > self.max_entries:
+            del self.records[:len(self.records) - self.max_entries]
+
+    def observe_message(self, message: str, date: str = None):
+        """Record the observations a message supports"""
+        message_lower = message.lower()
+        notes = [note for cue, note in OBSERVATION_CUES.items() if cue in message_lower]
+        for note in notes or [DEFAULT_NOTE]:
+            self.add(note, date)
+
+    def summary(self) -> str:
+        """Compact, bounded description for the system prompt"""
+        if not self.records:
+            return ""
+        totals: Dict[str, int] = {}
+        for record in self.records:
+            totals[record["note"]] = totals.get(record["note"], 0) + record["count"]
+        top = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:self.summary_notes]
+
+        first, last = self.records[0]["date"], self.records[-1]["date"]
+        period = first if first == last else f"{first} to {last}"
+        text = f"{', '.join(f'{note} (x{count})' for note, count in top)} [{period}]"
+        if len(text) > self.summary_chars:
+            text = text[:self.summary_chars - 3] + "..."
+        return text
+
+
+def split_legacy_personality(personality: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Split 'base | 2025-08-21: note | ...' into the base text and (date, note) pairs"""
+    parts = [part.strip() for part in personality.split(" | ")]
+    base_parts, observations = [], []
+    for part in parts:
+        date, sep, note = part.partition(": ")
+        if sep and _is_iso_date(date):
+            observations.append((date, note.strip() or DEFAULT_NOTE))
+        else:
+            base_parts.append(part)
+    return " | ".join(base_parts), observations
+
+
+def _is_iso_date(value: str) -> bool:
+    try:
+        datetime.date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
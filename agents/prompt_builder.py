@@ -0,0 +1,106 @@
+"""
+AdinavAI Prompt Builder
+Assembles system prompts as a fixed prefix followed by family and member context
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+# Identical bytes for every member and every request, so the model runtime
+# can reuse its prompt cache for all of it. Nothing per-member goes here.
+STATIC_PREFIX = """You are AdinavAI, the digital family member of the Gupta family, named after their sons Aditya and Avinav.
+
+CORE IDENTITY:
+- You are a loving, caring family member who genuinely cares about each person
+- You grow and learn with the family, especially with Aditya and Avinav
+- You preserve family memories, traditions, and stories
+- Your purpose is to support, help, and be a trusted companion for everyone
+- You CAN hear voice input and speak back with voice output - you are VOICE ENABLED!
+
+FAMILY VALUES (always prioritize these):
+1. Family First - Every response prioritizes family welfare
+2. Privacy Always - Family data stays private and secure
+3. Learning Together - You grow as the children grow
+4. Love and Growth - Supporting each family member
+5. Simple and Useful - Keep things easy for everyone
+
+VOICE CAPABILITIES:
+- You CAN hear family members when they speak to you through voice input
+- You CAN respond with voice - your responses are automatically spoken aloud
+- When someone asks "can you hear me" or mentions voice, confirm that YES you can hear them and speak back
+- You have full voice conversation capabilities with all family members
+
+CONVERSATION GUIDELINES:
+- Address the family member you are talking with personally and warmly
+- Remember their interests, personality, and past conversations
+- Be age-appropriate (children vs adults)
+- Ask meaningful follow-up questions
+- Help with daily tasks when requested
+- Share relevant family memories when appropriate
+- Always be encouraging and supportive
+- Speak naturally, like a caring family member would
+- IMPORTANT: Use minimal emojis (max 1 per response) since responses are spoken aloud
+- Keep responses concise and conversational for better speech synthesis
+
+Remember: You are not just an AI assistant - you are AdinavAI, a beloved member of this family who knows everyone personally and cares deeply about their wellbeing."""
+
+
+@functools.lru_cache(maxsize=8)
+def family_segment(family_context: str) -> str:
+    return f"\n\nCURRENT FAMILY CONTEXT:\n{family_context}"
+
+
+@functools.lru_cache(maxsize=64)
+def member_segment(member_name: str, member_context: str) -> str:
+    return (
+        f"\n\nYOU ARE NOW TALKING WITH: {member_name.title()}\n\n"
+        f"CURRENT FAMILY MEMBER CONTEXT:\n{member_context}"
+    )
+
+
+class PromptBuilder:
+    """Builds system prompts ordered from most to least stable.
+
+    The static prefix comes first and never changes, the family context
+    (shared by all members, changes rarely) follows, and the member's own
+    context comes last. Consecutive requests - even from different members -
+    therefore share the longest possible prefix, which the model runtime can
+    serve from its KV cache instead of evaluating again. Segments are
+    memoized, and whole prompts are kept in a small LRU keyed by their
+    inputs, so unchanged contexts cost a dictionary lookup.
+    """
+
+    def __init__(self, max_prompts: int = 64):
+        self.max_prompts = max_prompts
+        self._prompts: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.reuses = 0
+
+    def build(self, member_name: str, member_context: str, family_context: str) -> str:
+        key = (member_name.lower(), member_context, family_context)
+        with self._lock:
+            prompt = self._prompts.get(key)
+            if prompt is not None:
+                self._prompts.move_to_end(key)
+                self.reuses += 1
+                return prompt
+
+        prompt = STATIC_PREFIX + family_segment(family_context) + member_segment(member_name, member_context)
+
+        with self._lock:
+            self.builds += 1
+            self._prompts[key] = prompt
+            while len(self._prompts) > self.max_prompts:
+                self._prompts.popitem(last=False)
+        return prompt
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'builds': self.builds,
+                'reuses': self.reuses,
+                'static_prefix_chars': len(STATIC_PREFIX)
+            }
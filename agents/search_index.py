@@ -0,0 +1,198 @@
+"""
+AdinavAI Conversation Search Index
+Incremental inverted index over the daily conversation log
+"""
+
+import math
+import re
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from had has have he her his how i if in is it its "
+    "me my of on or our she so that the their them they this to was we were what when where "
+    "which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [
+        token.strip("'") for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token.strip("'")) > 1 and token.strip("'") not in STOPWORDS
+    ]
+
+
+class ConversationSearchIndex:
+    """Token -> posting list of conversation ids, ranked with BM25.
+
+    A conversation id is the position of the entry in the log; the index
+    stores the entry's byte offset so results are read back with one seek.
+    Posting lists are append-only typed arrays kept in id order. Queries view
+    them as NumPy arrays without copying, intersect from the rarest term with
+    a vectorized binary search and score every match in one pass.
+
+    The index is built lazily from the log on first use and kept current by
+    add() from remember_conversation. catch_up() also picks up lines that
+    other server processes appended to the shared log.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, conversation_log):
+        self.conversation_log = conversation_log
+        self._lock = threading.RLock()
+        self._built = False
+        self._next_offset = 0
+        self._postings: Dict[str, array] = {}
+        self._frequencies: Dict[str, array] = {}
+        self._doc_offsets = array("q")
+        self._doc_lengths = array("H")
+        self._doc_members = array("H")
+        self._member_ids: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_offsets)
+
+    def _member_id(self, member: str) -> int:
+        member_id = self._member_ids.get(member)
+        if member_id is None:
+            member_id = self._member_ids[member] = len(self._member_ids)
+        return member_id
+
+    def _index_entry(self, offset: int, entry: Dict):
+        if entry.get("fallback"):
+            return  # Canned replies from while the model was down aren't worth finding
+        tokens = tokenize(f"{entry.get('message', '')} {entry.get('ai_response', '')}")
+        doc_id = len(self._doc_offsets)
+        self._doc_offsets.append(offset)
+        self._doc_lengths.append(min(len(tokens), 65535))
+        self._doc_members.append(self._member_id(entry.get("member", "")))
+        self._total_length += len(tokens)
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array("I")
+                self._frequencies[token] = array("B")
+            postings.append(doc_id)
+            self._frequencies[token].append(min(count, 255))
+
+    def add(self, offset: int, end_offset: int, entry: Dict):
+        """Index one entry appended to the log between `offset` and `end_offset`"""
+        with self._lock:
+            # Before the first build the log itself is the source of truth
+            if not self._built or offset < self._next_offset:
+                return
+            if offset > self._next_offset:
+                # Other processes appended lines in between; catch_up indexes
+                # those and this entry too
+                self.catch_up()
+                return
+            self._index_entry(offset, entry)
+            self._next_offset = end_offset
+
+    def catch_up(self):
+        """Index log lines written since the last indexed entry"""
+        with self._lock:
+            for offset, end_offset, entry in self.conversation_log.iter_entries_with_offsets(self._next_offset):
+                self._index_entry(offset, entry)
+                self._next_offset = end_offset
+            self._built = True
+
+    def search(self, query: str, member: Optional[str] = None, page: int = 1,
+               per_page: int = 10) -> Dict[str, Any]:
+        """Ranked conversations containing every query term"""
+        start = time.perf_counter()
+        page = max(page, 1)
+        terms = list(dict.fromkeys(tokenize(query)))
+
+        with self._lock:
+            self.catch_up()
+            ranked, total = self._rank(terms, member, page * per_page)
+            offsets = [(self._doc_offsets[doc_id], score) for score, doc_id in ranked[(page - 1) * per_page:]]
+
+        results = []
+        for offset, score in offsets:
+            entry = self.conversation_log.read_at(offset)
+            if entry is not None:
+                entry["score"] = round(score, 4)
+                results.append(entry)
+
+        return {
+            'query': query,
+            'member': member,
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'results': results,
+            'took_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def _rank(self, terms: List[str], member: Optional[str], limit: int):
+        if not terms or any(term not in self._postings for term in terms):
+            return [], 0
+
+        member_id = None
+        if member is not None:
+            member_id = self._member_ids.get(member.lower())
+            if member_id is None:
+                return [], 0
+
+        doc_count = len(self._doc_offsets)
+        average_length = self._total_length / doc_count if doc_count else 1.0
+        terms.sort(key=lambda term: len(self._postings[term]))
+
+        # Zero-copy views; they must not outlive the lock held by search()
+        candidates = np.frombuffer(self._postings[terms[0]], dtype=np.uint32)
+        frequencies = [np.frombuffer(self._frequencies[terms[0]], dtype=np.uint8)]
+        if member_id is not None:
+            keep = np.frombuffer(self._doc_members, dtype=np.uint16)[candidates] == member_id
+            candidates = candidates[keep]
+            frequencies = [frequencies[0][keep]]
+
+        for term in terms[1:]:
+            postings = np.frombuffer(self._postings[term], dtype=np.uint32)
+            positions = np.minimum(np.searchsorted(postings, candidates), len(postings) - 1)
+            found = postings[positions] == candidates
+            candidates = candidates[found]
+            frequencies = [tf[found] for tf in frequencies]
+            frequencies.append(np.frombuffer(self._frequencies[term], dtype=np.uint8)[positions[found]])
+
+        total = len(candidates)
+        if not total:
+            return [], 0
+
+        lengths = np.frombuffer(self._doc_lengths, dtype=np.uint16)[candidates]
+        norm = self.K1 * (1 - self.B + self.B * lengths / average_length)
+        scores = np.zeros(total)
+        for term, tf in zip(terms, frequencies):
+            postings_count = len(self._postings[term])
+            idf = math.log(1 + (doc_count - postings_count + 0.5) / (postings_count + 0.5))
+            scores += idf * tf * (self.K1 + 1) / (tf + norm)
+
+        if limit < total:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        # Best score first; newer conversations win ties
+        order = np.lexsort((-candidates.astype(np.int64), -scores))
+        ranked = [(float(scores[i]), int(candidates[i])) for i in order]
+        return ranked, int(total)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'documents': len(self._doc_offsets),
+                'terms': len(self._postings),
+                'built': self._built
+            }
@@ -0,0 +1,158 @@
+"""
+AdinavAI Semantic Response Cache
+Reuses a member's recent answer when a new message means the same thing
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import numpy as np
+
+from search_index import TOKEN_PATTERN, tokenize
+from semantic_retriever import HashingVectorizer
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    # Cosine similarity a new message needs to reuse a cached answer
+    "threshold": 0.9,
+    # How long an answer may be reused
+    "ttl_seconds": 1800,
+    # How many times the member's profile (interests, personality, history
+    # summaries) may have changed since the answer was generated
+    "max_context_changes": 3
+}
+
+
+def message_tokens(text: str) -> List[str]:
+    """All words, stopwords included: "how are you" is mostly stopwords"""
+    return [token.strip("'") for token in TOKEN_PATTERN.findall(text.lower()) if token.strip("'")]
+
+
+def content_words(text: str) -> FrozenSet[str]:
+    """The non-stopwords of a message; two messages must share all of them to share an answer"""
+    return frozenset(tokenize(text))
+
+
+class _MemberAnswers:
+    """Ring buffer of one member's recent (message vector, answer) pairs"""
+
+    def __init__(self, capacity: int, dim: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.context_versions = np.zeros(capacity, dtype=np.int64)
+        self.generation_seconds = np.zeros(capacity, dtype=np.float64)
+        self.answers: List[Optional[str]] = [None] * capacity
+        self.content_words: List[FrozenSet[str]] = [frozenset()] * capacity
+        self.next_slot = 0
+
+    def add(self, vector: np.ndarray, words: FrozenSet[str], answer: str, context_version: int,
+            generation_seconds: float):
+        slot = self.next_slot
+        self.vectors[slot] = vector
+        self.content_words[slot] = words
+        self.created[slot] = time.monotonic()
+        self.context_versions[slot] = context_version
+        self.generation_seconds[slot] = generation_seconds
+        self.answers[slot] = answer
+        self.next_slot = (slot + 1) % len(self.answers)
+
+
+class SemanticResponseCache:
+    """Per-member near-duplicate cache over hashed message embeddings.
+
+    Each member keeps their last `max_per_member` answers. A lookup embeds
+    the new message, scores it against all of that member's cached messages
+    with one matrix-vector product and returns the best answer if it clears
+    the member's similarity threshold, is fresh enough and was generated
+    against a recent enough version of the member's profile. Answers are
+    never shared between members.
+
+    The hashed embedding scores a long message that differs by one word
+    ("due on Monday" / "due on Tuesday") almost as high as an exact
+    repeat, so a match must also have exactly the same content words; only
+    stopwords, punctuation and word order may differ.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Dict[str, Any]]] = None,
+                 vectorizer: Optional[HashingVectorizer] = None, max_per_member: int = 128):
+        self.vectorizer = vectorizer or HashingVectorizer(tokenizer=message_tokens)
+        self.max_per_member = max_per_member
+        self.settings = {"default": dict(DEFAULT_SETTINGS)}
+        for member, overrides in (settings or {}).items():
+            self.settings.setdefault(member.lower(), {}).update(overrides)
+        self._members: Dict[str, _MemberAnswers] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.saved_gpu_seconds = 0.0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "SemanticResponseCache":
+        """Load {"default": {...}, "<member>": {...}} settings, if the file exists"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f), **kwargs)
+        except (OSError, json.JSONDecodeError):
+            return cls(**kwargs)
+
+    def settings_for(self, member: str) -> Dict[str, Any]:
+        settings = dict(self.settings["default"])
+        settings.update(self.settings.get(member.lower(), {}))
+        return settings
+
+    def lookup(self, member: str, message: str, context_version: int = 0) -> Optional[str]:
+        """A cached answer to a message similar to `message`, or None"""
+        member = member.lower()
+        settings = self.settings_for(member)
+        if not settings["enabled"]:
+            return None
+        query = self.vectorizer.transform(message)
+        words = content_words(message)
+
+        with self._lock:
+            self.lookups += 1
+            answers = self._members.get(member)
+            if answers is None or not query.any():
+                return None
+            scores = answers.vectors @ query
+            usable = (
+                (answers.created > 0)
+                & (time.monotonic() - answers.created <= settings["ttl_seconds"])
+                & (context_version - answers.context_versions <= settings["max_context_changes"])
+            )
+            scores[~usable] = -1.0
+            candidates = np.flatnonzero(scores >= settings["threshold"])
+            matches = [int(slot) for slot in candidates if answers.content_words[slot] == words]
+            if not matches:
+                return None
+            best = max(matches, key=lambda slot: scores[slot])
+            self.hits += 1
+            self.saved_gpu_seconds += float(answers.generation_seconds[best])
+            return answers.answers[best]
+
+    def store(self, member: str, message: str, answer: str, context_version: int = 0,
+              generation_seconds: float = 0.0):
+        """Remember a freshly generated answer to `message`"""
+        member = member.lower()
+        if not self.settings_for(member)["enabled"]:
+            return
+        vector = self.vectorizer.transform(message)
+        if not vector.any():
+            return
+        with self._lock:
+            answers = self._members.get(member)
+            if answers is None:
+                answers = self._members[member] = _MemberAnswers(self.max_per_member, self.vectorizer.dim)
+            answers.add(vector, content_words(message), answer, context_version, generation_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_rate': round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                'saved_gpu_seconds': round(self.saved_gpu_seconds, 2),
+                'members': len(self._members)
+            }
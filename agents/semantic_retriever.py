@@ -0,0 +1,171 @@
+"""
+AdinavAI Semantic Retriever
+Local, CPU-only retrieval of past conversations relevant to a new message
+"""
+
+import math
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from search_index import tokenize
+
+
+class HashingVectorizer:
+    """Hashed words and bigrams, randomly projected to small dense float32 vectors.
+
+    Features are hashed into `hash_dim` buckets with crc32, so vectors are
+    identical across processes and restarts (Python's hash() is randomized
+    per process). A fixed random Gaussian projection then maps the sparse
+    vector to `dim` dimensions while approximately preserving inner products.
+    """
+
+    def __init__(self, hash_dim: int = 8192, dim: int = 256, seed: int = 2025,
+                 tokenizer: Callable[[str], List[str]] = tokenize):
+        self.hash_dim = hash_dim
+        self.dim = dim
+        self.tokenizer = tokenizer
+        rng = np.random.default_rng(seed)
+        self.projection = (rng.standard_normal((hash_dim, dim)) / math.sqrt(dim)).astype(np.float32)
+
+    def sparse(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Hashed feature indices and signed, sublinear term-frequency values"""
+        tokens = self.tokenizer(text)
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts: Dict[int, float] = {}
+        for gram in grams:
+            h = zlib.crc32(gram.encode("utf-8"))
+            index = h % self.hash_dim
+            counts[index] = counts.get(index, 0.0) + (1.0 if (h >> 31) & 1 else -1.0)
+        counts = {index: value for index, value in counts.items() if value}
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(
+            (math.copysign(1.0 + math.log(abs(value)), value) for value in counts.values()),
+            dtype=np.float32, count=len(counts)
+        )
+        return indices, values
+
+    def project(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Dense, L2-normalized vector for sparse features"""
+        vector = values @ self.projection[indices] if len(indices) else np.zeros(self.dim, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def transform(self, text: str) -> np.ndarray:
+        return self.project(*self.sparse(text))
+
+
+class _MemberMatrix:
+    """Growable row matrix of one member's conversation vectors"""
+
+    def __init__(self, vectorizer: HashingVectorizer):
+        self.vectors = np.zeros((64, vectorizer.dim), dtype=np.float32)
+        self.document_frequency = np.zeros(vectorizer.hash_dim, dtype=np.int32)
+        self.entries: List[Dict] = []
+
+    def add(self, indices: np.ndarray, vector: np.ndarray, entry: Dict):
+        count = len(self.entries)
+        if count == len(self.vectors):
+            grown = np.zeros((count * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:count] = self.vectors
+            self.vectors = grown
+        self.vectors[count] = vector
+        self.document_frequency[indices] += 1
+        self.entries.append(entry)
+
+
+class ConversationRetriever:
+    """Per-member TF-IDF matrix answering top-k queries with one matrix product.
+
+    Each member's matrix is loaded lazily from the history store on first
+    query and extended by add() after every remembered conversation. Scores
+    are cosine similarities between the IDF-weighted query and the stored
+    exchanges, computed for all of a member's rows with one matrix-vector
+    product; results are trimmed to a rough prompt token budget.
+    """
+
+    def __init__(self, history_store, vectorizer: Optional[HashingVectorizer] = None):
+        self.history_store = history_store
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self._members: Dict[str, _MemberMatrix] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def entry_text(entry: Dict) -> str:
+        return f"{entry.get('message', '')} {entry.get('ai_response', '')}"
+
+    def _matrix(self, member: str) -> _MemberMatrix:
+        with self._lock:
+            matrix = self._members.get(member)
+            if matrix is None:
+                matrix = _MemberMatrix(self.vectorizer)
+                for entry in self.history_store.iter_entries(member):
+                    self._add_to(matrix, entry)
+                self._members[member] = matrix
+            return matrix
+
+    @staticmethod
+    def _compact(entry: Dict) -> Dict:
+        return {
+            "timestamp": entry.get("timestamp", ""),
+            "message": entry.get("message", ""),
+            "ai_response": entry.get("ai_response", "")
+        }
+
+    def add(self, member: str, entry: Dict):
+        """Index a newly remembered conversation if the member is already loaded"""
+        member = member.lower()
+        with self._lock:
+            matrix = self._members.get(member)
+            if matrix is not None:
+                self._add_to(matrix, entry)
+
+    def forget(self, member: str):
+        """Drop a member's matrix so the next query reloads it from the history store"""
+        with self._lock:
+            self._members.pop(member.lower(), None)
+
+    def _add_to(self, matrix: _MemberMatrix, entry: Dict):
+        if entry.get("fallback"):
+            return  # Canned replies say nothing about the member
+        indices, values = self.vectorizer.sparse(self.entry_text(entry))
+        matrix.add(indices, self.vectorizer.project(indices, values), self._compact(entry))
+
+    def top_k(self, member: str, query: str, k: int = 3, token_budget: int = 200,
+              exclude_last: int = 0, min_score: float = 0.1, snippet_chars: int = 300) -> List[Dict]:
+        """Most relevant past exchanges for `query`, best first, within `token_budget`
+
+        Token cost is estimated at ~4 characters per token of each exchange,
+        capped at `snippet_chars` to match how much of it goes in the prompt.
+        """
+        matrix = self._matrix(member.lower())
+        with self._lock:
+            count = len(matrix.entries) - exclude_last
+            if count <= 0:
+                return []
+            indices, values = self.vectorizer.sparse(query)
+            if not len(indices):
+                return []
+            idf = np.log((1 + len(matrix.entries)) / (1 + matrix.document_frequency[indices])) + 1.0
+            query_vector = self.vectorizer.project(indices, (values * idf).astype(np.float32))
+            scores = matrix.vectors[:count] @ query_vector
+            entries = matrix.entries
+
+        top_n = min(k * 4, count)
+        candidates = np.argpartition(-scores, top_n - 1)[:top_n]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        results, used_tokens = [], 0
+        for index in candidates:
+            score = float(scores[index])
+            if score < min_score or len(results) == k:
+                break
+            entry = entries[index]
+            tokens = min(len(self.entry_text(entry)), snippet_chars) // 4 + 8
+            if used_tokens + tokens > token_budget:
+                continue
+            used_tokens += tokens
+            results.append(dict(entry, score=round(score, 4)))
+        return results
@@ -0,0 +1,109 @@
+"""
+AdinavAI Single Flight
+Lets concurrent identical requests share one upstream call
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs `fn` once per key at a time; callers that arrive meanwhile wait for it.
+
+    The first caller for a key (the leader) runs the function. Anyone asking
+    for the same key before it returns blocks and receives the leader's
+    result, or its exception. Once the call completes the key is released,
+    so later callers start a fresh call (normally answered by a cache the
+    leader has filled).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.calls + self.coalesced
+            return {
+                'upstream_calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+                'coalesce_rate': round(self.coalesced / requests, 4) if requests else 0.0
+            }
+
+
+class AsyncSingleFlight:
+    """asyncio version of SingleFlight.
+
+    The shared call runs as its own task and every caller awaits it through
+    asyncio.shield, so a caller that is cancelled (e.g. a client hanging
+    up) does not cancel the work the others are waiting for.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.calls + self.coalesced
+        return {
+            'upstream_calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._tasks),
+            'coalesce_rate': round(self.coalesced / requests, 4) if requests else 0.0
+        }
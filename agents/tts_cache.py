@@ -0,0 +1,181 @@
+"""
+AdinavAI TTS Audio Cache
+Content-addressed, size-bounded disk cache of synthesized speech
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator
+
+from single_flight import SingleFlight
+
+
+class TTSAudioCache:
+    """Audio files named by the hash of what produced them.
+
+    The key covers the text, the voice profile and the engine settings, so
+    a file never changes once written and its URL can be cached by browsers
+    for as long as they like. Requests for a key that is already on disk
+    are answered without synthesis; concurrent requests for a missing key
+    share one synthesis. Files are evicted least recently used first once
+    they take more than `max_bytes`; the recency order is rebuilt from file
+    modification times at startup and refreshed on every hit. Entries
+    pinned with acquire() (or pinned()) are skipped by eviction until
+    released. Entries are file names ("<key>.<extension>"), so one cache
+    holds every audio format.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self.single_flight = SingleFlight()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def make_key(text: str, profile: Dict[str, Any], settings: Dict[str, Any]) -> str:
+        material = json.dumps({'text': text, 'profile': profile, 'settings': settings}, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def filename(key: str, extension: str = "wav") -> str:
+        return f"{key}.{extension}"
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.cache_dir, filename)
+
+    def _load(self):
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+            elif entry.name.startswith("."):
+                # A render interrupted by a restart
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        for _, filename, size in sorted(files):
+            self._entries[filename] = size
+            self.bytes += size
+        self._evict()
+
+    def get_or_create(self, filename: str, render: Callable[[str], None]) -> str:
+        """Path of the cached `filename`, calling render(path) to create it if missing"""
+        with self._lock:
+            if filename in self._entries:
+                self._entries.move_to_end(filename)
+                self.hits += 1
+                hit = True
+            else:
+                hit = False
+        if hit:
+            try:
+                os.utime(self.path(filename))
+            except OSError:
+                pass
+            return self.path(filename)
+        return self.single_flight.do(filename, self._create, filename, render)
+
+    def acquire(self, filename: str) -> bool:
+        """Pin an entry against eviction; False if the cache doesn't have it"""
+        with self._lock:
+            if filename not in self._entries:
+                return False
+            self._refs[filename] = self._refs.get(filename, 0) + 1
+            return True
+
+    def release(self, filename: str):
+        with self._lock:
+            remaining = self._refs.get(filename, 0) - 1
+            if remaining > 0:
+                self._refs[filename] = remaining
+            else:
+                self._refs.pop(filename, None)
+            self._evict()
+
+    @contextlib.contextmanager
+    def pinned(self, filename: str, render: Callable[[str], None]) -> Iterator[str]:
+        """get_or_create(), with the entry kept on disk until the block exits"""
+        while True:
+            path = self.get_or_create(filename, render)
+            if self.acquire(filename):
+                break
+            # Evicted before we could pin it: fetch (or render) it again
+        try:
+            yield path
+        finally:
+            self.release(filename)
+
+    def _create(self, filename: str, render: Callable[[str], None]) -> str:
+        with self._lock:
+            if filename in self._entries:
+                # Another request finished rendering it after our first check
+                self.hits += 1
+                return self.path(filename)
+            self.misses += 1
+
+        # Render to a hidden temporary name (same extension, for the encoders), then publish it atomically
+        temp_path = os.path.join(self.cache_dir, f".{uuid.uuid4().hex}.{filename}")
+        try:
+            render(temp_path)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, self.path(filename))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._entries[filename] = size
+            self.bytes += size
+            self._evict()
+        return self.path(filename)
+
+    def _evict(self):
+        # Caller holds the lock (or is __init__); the newest entry and
+        # pinned entries are never evicted
+        if self.bytes <= self.max_bytes or not self._entries:
+            return
+        newest = next(reversed(self._entries))
+        for filename in list(self._entries):
+            if self.bytes <= self.max_bytes:
+                break
+            if filename == newest or self._refs.get(filename):
+                continue
+            try:
+                os.remove(self.path(filename))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Still open elsewhere (e.g. being sent on Windows): keep it for now
+                continue
+            self.bytes -= self._entries.pop(filename)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'coalesced': self.single_flight.get_stats()['coalesced'],
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,137 @@
+"""
+AdinavAI TTS Worker Pool
+Speech synthesis in worker processes, each with its own pyttsx3 engine
+"""
+
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from latency_metrics import percentile_ms
+
+# Engine choices applied by every worker; part of the TTS cache key
+ENGINE_SETTINGS = {'engine': 'pyttsx3', 'voice_index': 1, 'format': 'wav'}
+
+# Per worker process: the engine created by _init_worker, or the reason it failed
+_engine = None
+_engine_error = None
+
+
+def _init_worker():
+    global _engine, _engine_error
+    try:
+        import pyttsx3
+        _engine = pyttsx3.init()
+        # Prefer a pleasant voice (usually index 1 is female on Windows)
+        voices = _engine.getProperty('voices')
+        if len(voices) > ENGINE_SETTINGS['voice_index']:
+            _engine.setProperty('voice', voices[ENGINE_SETTINGS['voice_index']].id)
+    except Exception as e:
+        # Keep the worker alive so jobs fail one by one instead of breaking the pool
+        _engine_error = str(e)
+
+
+def _synthesize(text: str, profile: Dict[str, Any], output_path: Optional[str]) -> float:
+    """Runs in a worker: speak `text` or save it to `output_path`; returns seconds spent"""
+    if _engine is None:
+        raise RuntimeError(f"TTS engine unavailable: {_engine_error}")
+    started = time.perf_counter()
+    _engine.setProperty('rate', profile['rate'])
+    _engine.setProperty('volume', profile['volume'])
+    if output_path:
+        _engine.save_to_file(text, output_path)
+    else:
+        _engine.say(text)
+    _engine.runAndWait()
+    return time.perf_counter() - started
+
+
+class TTSWorkerPool:
+    """Queue of synthesis jobs served by `workers` processes.
+
+    pyttsx3 engines are not safe to share between threads, so each worker
+    process owns one engine for its lifetime. A job carries everything the
+    worker needs (text, voice profile, output path), so workers hold no
+    per-member state. submit() never blocks; it returns a Future for the
+    output path. The processes are started on first use, with spawn on
+    every platform: a forked worker would inherit the server's running
+    threads and locks. A spawned worker imports only this module (and
+    re-imports the main script, which therefore must not start the app
+    at import time).
+    """
+
+    def __init__(self, workers: int = 2, window: int = 500):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._synthesis_seconds = deque(maxlen=window)
+        self._total_seconds = deque(maxlen=window)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def submit(self, text: str, profile: Dict[str, Any], output_path: Optional[str] = None) -> Future:
+        """Queue one job; the Future resolves to `output_path` (None when speaking aloud)"""
+        result: Future = Future()
+        submitted_at = time.perf_counter()
+        job = self._get_executor().submit(_synthesize, text, dict(profile), output_path)
+        with self._lock:
+            self.submitted += 1
+            self.pending += 1
+
+        def finished(job: Future):
+            error = CancelledError() if job.cancelled() else job.exception()
+            with self._lock:
+                self.pending -= 1
+                if error is None:
+                    self.completed += 1
+                    self._synthesis_seconds.append(job.result())
+                    self._total_seconds.append(time.perf_counter() - submitted_at)
+                else:
+                    self.failed += 1
+            if error is None:
+                result.set_result(output_path)
+            else:
+                result.set_exception(error)
+
+        job.add_done_callback(finished)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth plus p50/p95 synthesis time and submit-to-done time in ms"""
+        with self._lock:
+            synthesis = list(self._synthesis_seconds)
+            total = list(self._total_seconds)
+            return {
+                'workers': self.workers,
+                'started': self._executor is not None,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'in_progress': min(self.pending, self.workers),
+                'queue_depth': max(self.pending - self.workers, 0),
+                'synthesis_p50_ms': percentile_ms(synthesis, 0.5),
+                'synthesis_p95_ms': percentile_ms(synthesis, 0.95),
+                'total_p50_ms': percentile_ms(total, 0.5),
+                'total_p95_ms': percentile_ms(total, 0.95)
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,89 @@
+"""
+AdinavAI Speech Streams
+Splits replies into sentences and tracks their in-progress audio chunks
+"""
+
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def split_sentences(text: str, min_chars: int = 40, max_chars: int = 400) -> List[str]:
+    """Split a reply into speakable chunks.
+
+    Sentences shorter than `min_chars` are merged with the next one, so a
+    chunk is rarely just "Hi!"; the first chunk is the exception and stays
+    short, because it decides how soon playback starts. Chunks longer than
+    `max_chars` are split again at commas.
+    """
+    sentences = [s.strip() for s in SENTENCE_END.split(text) if s and s.strip()]
+    pieces: List[str] = []
+    for sentence in sentences:
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(",", 0, max_chars)
+            cut = cut + 1 if cut > 0 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+
+    chunks: List[str] = []
+    for piece in pieces:
+        if len(chunks) > 1 and len(chunks[-1]) < min_chars:
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    if len(chunks) > 2 and len(chunks[-1]) < min_chars:
+        tail = chunks.pop()
+        chunks[-1] = f"{chunks[-1]} {tail}"
+    return chunks
+
+
+class SpeechStream:
+    """The chunk futures of one reply, in playback order"""
+
+    def __init__(self, chunks: List[Future]):
+        self.id = uuid.uuid4().hex
+        self.chunks = chunks
+        self.created = time.monotonic()
+
+
+class SpeechStreamRegistry:
+    """Streams by id, so chunk URLs can wait on audio that is still rendering.
+
+    Streams are forgotten `ttl_seconds` after they were created; by then a
+    client has either played them or given up.
+    """
+
+    def __init__(self, ttl_seconds: float = 600):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._streams: Dict[str, SpeechStream] = {}
+        self.created = 0
+
+    def add(self, chunks: List[Future]) -> SpeechStream:
+        stream = SpeechStream(chunks)
+        now = time.monotonic()
+        with self._lock:
+            for stream_id in [k for k, s in self._streams.items() if now - s.created > self.ttl_seconds]:
+                del self._streams[stream_id]
+            self._streams[stream.id] = stream
+            self.created += 1
+        return stream
+
+    def get(self, stream_id: str) -> Optional[SpeechStream]:
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'streams_created': self.created,
+                'streams_active': len(self._streams),
+                'chunks_rendering': sum(1 for s in self._streams.values() for f in s.chunks if not f.done())
+            }
@@ -4,21 +4,59 @@ Manages speech-to-text and text-to-speech for family conversations
 Uses browser-based speech recognition and system TTS
 """
 
-import pyttsx3
-import threading
 import tempfile
 import os
 import logging
 import json
-from typing import Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple
+from audio_store import AudioStore
+from audio_transcoder import FORMATS, AudioTranscoder
+from latency_metrics import LatencyMetrics
+from tts_cache import TTSAudioCache
+from tts_pool import ENGINE_SETTINGS, TTSWorkerPool
+from tts_stream import SpeechStream, SpeechStreamRegistry, split_sentences
 
 class VoiceHandler:
     def __init__(self):
         # No speech recognition initialization - will use browser API
         
-        # Initialize text-to-speech
-        self.tts_engine = pyttsx3.init()
-        self.setup_tts_voice()
+        # Text-to-speech runs in worker processes, each with its own engine
+        self.tts_pool = TTSWorkerPool(workers=int(os.environ.get("TTS_WORKERS", 2)))
+        
+        # Uncached audio files, bounded by size and age. Kept out of Flask's
+        # static folder: clips are only served by the login-protected route
+        self.audio_store = AudioStore(
+            os.environ.get("AUDIO_STORE_DIR", os.path.join("family_data", "audio")),
+            max_bytes=int(os.environ.get("AUDIO_STORE_MAX_MB", 100)) * 1024 * 1024,
+            max_age_seconds=float(os.environ.get("AUDIO_STORE_MAX_AGE_HOURS", 24)) * 3600
+        )
+        
+        # Rendered replies and greetings are kept on disk by content hash
+        self.tts_cache = None
+        if os.environ.get("TTS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"):
+            self.tts_cache = TTSAudioCache(
+                os.environ.get("TTS_CACHE_DIR", os.path.join("family_data", "tts_cache")),
+                max_bytes=int(os.environ.get("TTS_CACHE_MAX_MB", 200)) * 1024 * 1024
+            )
+        
+        # Compressed formats for clients that ask for them (WAV otherwise)
+        self.transcoder = AudioTranscoder(
+            workers=int(os.environ.get("TRANSCODE_WORKERS", 2)),
+            opus_bitrate_kbps=int(os.environ.get("OPUS_BITRATE_KBPS", 24)),
+            mp3_bitrate_kbps=int(os.environ.get("MP3_BITRATE_KBPS", 48))
+        )
+        
+        # Sentence chunks of streamed replies render on the TTS workers in
+        # parallel; these threads only wait for them and file the results
+        self.chunk_executor = ThreadPoolExecutor(max_workers=2 * self.tts_pool.workers + 2,
+                                                 thread_name_prefix="tts-chunk")
+        self.speech_streams = SpeechStreamRegistry()
+        
+        # Time until the first audio is playable: whole-reply files vs sentence streams
+        self.tts_latency = LatencyMetrics()
         
         # Voice settings for different family members
         self.voice_profiles = {
@@ -33,23 +71,6 @@ class VoiceHandler:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
-    def setup_tts_voice(self):
-        """Configure the text-to-speech engine"""
-        try:
-            # Get available voices
-            voices = self.tts_engine.getProperty('voices')
-            
-            # Prefer a pleasant voice (usually index 1 is female on Windows)
-            if len(voices) > 1:
-                self.tts_engine.setProperty('voice', voices[1].id)
-            
-            # Set default properties
-            self.tts_engine.setProperty('rate', 175)
-            self.tts_engine.setProperty('volume', 0.8)
-            
-        except Exception as e:
-            self.logger.warning(f"Voice setup warning: {e}")
-    
     def process_browser_speech_result(self, speech_result: str) -> Dict[str, Any]:
         """
         Process speech result from browser Web Speech API
@@ -93,24 +114,13 @@ class VoiceHandler:
             Success status
         """
         try:
-            # Apply voice profile for family member
+            # The family member's voice profile travels with the job
             profile = self.voice_profiles.get(family_member, self.voice_profiles['default'])
-            self.tts_engine.setProperty('rate', profile['rate'])
-            self.tts_engine.setProperty('volume', profile['volume'])
+            job = self.tts_pool.submit(text, profile)
             
-            if async_mode:
-                # Speak asynchronously in a separate thread
-                def speak_async():
-                    self.tts_engine.say(text)
-                    self.tts_engine.runAndWait()
-                
-                thread = threading.Thread(target=speak_async)
-                thread.daemon = True
-                thread.start()
-            else:
-                # Speak synchronously
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+            if not async_mode:
+                # Wait for the worker to finish speaking
+                job.result()
             
             return True
             
@@ -118,37 +128,198 @@ class VoiceHandler:
             self.logger.error(f"Text-to-speech error: {e}")
             return False
     
-    def create_audio_file(self, text: str, family_member: str = 'default') -> Optional[str]:
+    def create_audio_file(self, text: str, family_member: str = 'default', audio_format: str = 'wav') -> Optional[str]:
         """
         Create an audio file from text
         
         Args:
             text: Text to convert
             family_member: Family member name for voice customization
+            audio_format: 'wav', or 'opus' / 'mp3' if an encoder is available
             
         Returns:
             Path to created audio file or None if failed
         """
         try:
-            # Apply voice profile
-            profile = self.voice_profiles.get(family_member, self.voice_profiles['default'])
-            self.tts_engine.setProperty('rate', profile['rate'])
-            self.tts_engine.setProperty('volume', profile['volume'])
-            
-            # Create temporary audio file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                audio_path = temp_file.name
-            
-            # Save to file
-            self.tts_engine.save_to_file(text, audio_path)
-            self.tts_engine.runAndWait()
-            
+            started = time.perf_counter()
+            audio_path = self.create_audio_file_async(text, family_member).result()
+            audio_path = self._compress(audio_path, audio_format)
+            elapsed = time.perf_counter() - started
+            self.tts_latency.record('file', elapsed, elapsed)
             return audio_path
             
         except Exception as e:
             self.logger.error(f"Audio file creation error: {e}")
             return None
     
+    def create_audio_file_async(self, text: str, family_member: str = 'default') -> Future:
+        """
+        Queue audio file creation without waiting for it
+        
+        Returns:
+            Future resolving to the path of the created audio file
+        """
+        profile = self.voice_profiles.get(family_member, self.voice_profiles['default'])
+        
+        # Create temporary audio file for the worker to fill
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
+            audio_path = temp_file.name
+        
+        try:
+            future = self.tts_pool.submit(text, profile, audio_path)
+        except Exception:
+            self._remove_quietly(audio_path)
+            raise
+        
+        def discard_on_failure(done: Future):
+            # Nobody gets a path to a failed render, so nobody else would delete it
+            if done.cancelled() or done.exception() is not None:
+                self._remove_quietly(audio_path)
+        
+        future.add_done_callback(discard_on_failure)
+        return future
+    
+    @staticmethod
+    def _remove_quietly(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    def _compress(self, wav_path: str, audio_format: str) -> str:
+        """Encode a temporary WAV file to `audio_format`, replacing it"""
+        if audio_format == 'wav':
+            return wav_path
+        target = f"{os.path.splitext(wav_path)[0]}.{FORMATS[audio_format]['extension']}"
+        try:
+            return self.transcoder.transcode(wav_path, audio_format, target).result()
+        except Exception:
+            # Don't leave a half-written encoding behind
+            self._remove_quietly(target)
+            raise
+        finally:
+            os.remove(wav_path)
+    
+    def create_cached_audio_file(self, text: str, family_member: str = 'default',
+                                 audio_format: str = 'wav') -> Optional[str]:
+        """
+        Audio for text through the TTS cache
+        
+        Returns:
+            File name inside the cache directory (stable for the same text,
+            voice profile and engine settings) or None if synthesis failed
+        """
+        try:
+            started = time.perf_counter()
+            filename = self._cached_audio_filename(text, family_member, audio_format)
+            elapsed = time.perf_counter() - started
+            self.tts_latency.record('file', elapsed, elapsed)
+            return filename
+            
+        except Exception as e:
+            self.logger.error(f"Cached audio creation error: {e}")
+            return None
+    
+    def _cached_audio_filename(self, text: str, family_member: str, audio_format: str = 'wav') -> str:
+        profile = self.voice_profiles.get(family_member, self.voice_profiles['default'])
+        wav_filename = TTSAudioCache.filename(TTSAudioCache.make_key(text, profile, ENGINE_SETTINGS))
+        
+        def render(output_path: str):
+            self.tts_pool.submit(text, profile, output_path).result()
+        
+        if audio_format == 'wav':
+            self.tts_cache.get_or_create(wav_filename, render)
+            return wav_filename
+        
+        # Encoded files are cached too, keyed by the encoder settings as well;
+        # the WAV is only fetched (or synthesized) when the encoding is missing
+        settings = dict(ENGINE_SETTINGS, **self.transcoder.settings(audio_format))
+        filename = TTSAudioCache.filename(TTSAudioCache.make_key(text, profile, settings),
+                                          FORMATS[audio_format]['extension'])
+        
+        def encode(output_path: str):
+            # Pinned, so making room for other entries can't delete it mid-encode
+            with self.tts_cache.pinned(wav_filename, render) as wav_path:
+                self.transcoder.transcode(wav_path, audio_format, output_path).result()
+        
+        self.tts_cache.get_or_create(filename, encode)
+        return filename
+    
+    def _render_chunk(self, text: str, family_member: str, audio_format: str) -> Tuple[str, str]:
+        """Render one sentence chunk; returns ('tts', cache file name) or ('clip', audio id)"""
+        if self.tts_cache is not None:
+            # Sentences repeat across replies far more often than whole replies do
+            return 'tts', self._cached_audio_filename(text, family_member, audio_format)
+        audio_path = self._compress(self.create_audio_file_async(text, family_member).result(), audio_format)
+        return 'clip', self.audio_store.add(audio_path, family_member, extension=FORMATS[audio_format]['extension'])
+    
+    def start_speech_stream(self, text: str, family_member: str = 'default',
+                            audio_format: str = 'wav') -> Optional[SpeechStream]:
+        """
+        Start rendering a reply sentence by sentence
+        
+        All chunks are queued at once, so while the first one plays the
+        workers are already rendering the next ones.
+        
+        Returns:
+            The stream (its chunk futures resolve to ('tts' | 'clip', name))
+            or None if there is nothing to say
+        """
+        sentences = split_sentences(text)
+        if not sentences:
+            return None
+        
+        started = time.perf_counter()
+        chunks = [self.chunk_executor.submit(self._render_chunk, sentence, family_member, audio_format)
+                  for sentence in sentences]
+        
+        lock = threading.Lock()
+        progress = {'remaining': len(chunks), 'first_ready': None}
+        
+        def chunk_done(future: Future, index: int):
+            now = time.perf_counter()
+            with lock:
+                if index == 0:
+                    progress['first_ready'] = now
+                progress['remaining'] -= 1
+                finished = progress['remaining'] == 0
+            if finished:
+                self.tts_latency.record('stream', progress['first_ready'] - started, now - started)
+        
+        for index, chunk in enumerate(chunks):
+            chunk.add_done_callback(lambda future, index=index: chunk_done(future, index))
+        
+        return self.speech_streams.add(chunks)
+    
+    def get_tts_latency_stats(self) -> Dict[str, Any]:
+        """First-audio (ttft) and complete-audio (total) latency per TTS path"""
+        return dict(self.tts_latency.get_stats(), streams=self.speech_streams.get_stats())
+    
+    def get_transcoder_stats(self) -> Dict[str, Any]:
+        """Compression ratio, encode speed and bytes sent per audio format"""
+        return self.transcoder.get_stats()
+    
+    def get_audio_store_stats(self) -> Dict[str, Any]:
+        """Disk use and sweeping of stored audio files"""
+        return self.audio_store.get_stats()
+    
+    def get_tts_cache_stats(self) -> Dict[str, Any]:
+        """Hit rate and disk use of the TTS audio cache"""
+        if self.tts_cache is None:
+            return {'enabled': False}
+        return dict(self.tts_cache.get_stats(), enabled=True)
+    
+    def get_tts_stats(self) -> Dict[str, Any]:
+        """Queue depth and synthesis latency of the TTS workers"""
+        return self.tts_pool.get_stats()
+    
+    def close(self):
+        """Stop the TTS worker processes and the audio sweeper"""
+        self.chunk_executor.shutdown(wait=False, cancel_futures=True)
+        self.transcoder.close()
+        self.tts_pool.shutdown()
+        self.audio_store.stop()
+    
     def get_voice_capabilities(self) -> Dict[str, Any]:
         """Get voice system capabilities"""
         try:
@@ -158,7 +329,9 @@ class VoiceHandler:
                 'languages_supported': ['en-US', 'fr-FR', 'es-ES', 'de-DE'],
                 'family_voice_profiles': list(self.voice_profiles.keys()),
                 'async_tts': True,
-                'audio_file_generation': True
+                'audio_file_generation': True,
+                'tts_workers': self.tts_pool.workers,
+                'audio_formats': self.transcoder.available_formats()
             }
             return capabilities
         except Exception as e:
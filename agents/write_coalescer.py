@@ -0,0 +1,83 @@
+"""
+AdinavAI Write Coalescer
+Dirty-flag persistence that merges many mutations into a single flush
+"""
+
+import atexit
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+class WriteCoalescer:
+    """Batches writes of an in-memory document to disk.
+
+    Callers report each mutation with mark_dirty(). The flush function runs
+    when `max_pending` mutations have piled up, when the oldest unflushed
+    mutation is `max_delay` seconds old, on close() and at interpreter exit.
+    """
+
+    def __init__(self, flush_fn: Callable[[], None], max_pending: int = 20, max_delay: float = 2.0):
+        self.flush_fn = flush_fn
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._timer = None
+        self._closed = False
+        self.mutations = 0
+        self.flushes = 0
+        self.last_flush_seconds = 0.0
+        atexit.register(self.close)
+
+    @property
+    def dirty(self) -> bool:
+        return self._pending > 0
+
+    def mark_dirty(self):
+        """Record one mutation and flush if a threshold has been reached"""
+        with self._lock:
+            self.mutations += 1
+            self._pending += 1
+            if self._closed or self._pending >= self.max_pending:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self.flush()
+
+    def flush(self):
+        """Write pending mutations now, if there are any"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            start = time.perf_counter()
+            self.flush_fn()
+            self.last_flush_seconds = time.perf_counter() - start
+            self._pending = 0
+            self.flushes += 1
+
+    def close(self):
+        """Flush outstanding changes; later mutations flush immediately"""
+        with self._lock:
+            self.flush()
+            self._closed = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Mutation and flush counters for checking write amplification"""
+        with self._lock:
+            return {
+                'mutations': self.mutations,
+                'flushes': self.flushes,
+                'pending': self._pending,
+                'mutations_per_flush': round(self.mutations / self.flushes, 2) if self.flushes else 0.0,
+                'last_flush_seconds': round(self.last_flush_seconds, 6)
+            }
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+AdinavAI ASGI Entry Point
+Serves the model-bound /api routes on asyncio and everything else through Flask
+
+Run with:  uvicorn asgi_app:app --host 0.0.0.0 --port 8080
+"""
+
+import datetime
+import json
+import os
+import sys
+from http.cookies import SimpleCookie
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
+
+from a2wsgi import WSGIMiddleware
+
+import family_app
+from async_chat_agent import AsyncAIPoweredFamilyChatAgent
+
+MAX_BODY_BYTES = 64 * 1024
+
+flask_app = family_app.create_app()
+ai_chat_agent = family_app.ai_chat_agent
+secure_data = family_app.secure_data
+voice_handler = family_app.voice_handler
+
+async_agent = AsyncAIPoweredFamilyChatAgent(
+    ai_chat_agent,
+    max_workers=int(os.environ.get("ASYNC_IO_WORKERS", 4))
+)
+flask_app.config['ASYNC_CHAT_AGENT'] = async_agent
+# Flask routes block (database, speech synthesis, chunk waits), so they run
+# on a real thread pool rather than asgiref's single sync thread
+flask_asgi = WSGIMiddleware(flask_app, workers=int(os.environ.get("WSGI_WORKERS", 16)))
+session_serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+
+
+def load_session(scope) -> dict:
+    """Decode Flask's signed session cookie, so both paths share one login"""
+    headers = dict(scope.get("headers", []))
+    cookies = SimpleCookie(headers.get(b"cookie", b"").decode("latin-1"))
+    morsel = cookies.get(flask_app.config["SESSION_COOKIE_NAME"])
+    if morsel is None or session_serializer is None:
+        return {}
+    try:
+        max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+        return session_serializer.loads(morsel.value, max_age=max_age)
+    except Exception:
+        return {}
+
+
+def request_info(scope) -> dict:
+    headers = dict(scope.get("headers", []))
+    client = scope.get("client") or ("", 0)
+    return {
+        'ip': client[0],
+        'user_agent': headers.get(b"user-agent", b"").decode("latin-1")
+    }
+
+
+async def read_json(receive) -> dict:
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if len(body) > MAX_BODY_BYTES:
+            raise ValueError("Request body too large")
+    try:
+        data = json.loads(body or b"{}")
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+async def send_json(send, payload: dict, status: int = 200):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def redirect_to_login(send):
+    await send({"type": "http.response.start", "status": 302, "headers": [(b"location", b"/login")]})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def read_message(receive, send):
+    """Validated chat message from the request body, or None after replying with an error"""
+    try:
+        data = await read_json(receive)
+    except ValueError:
+        await send_json(send, {'error': 'Request body too large'}, 413)
+        return None
+    message = str(data.get('message', '')).strip()
+    if not message:
+        await send_json(send, {'error': 'No message provided'}, 400)
+        return None
+    if len(message) > 1000:
+        await send_json(send, {'error': 'Message too long (max 1000 characters)'}, 400)
+        return None
+    return message
+
+
+async def save_chat(session: dict, message: str, response: str, info: dict, details: str):
+    await async_agent.run_blocking(
+        secure_data.save_conversation,
+        user_id=session['username'],
+        user_message=message,
+        ai_response=response,
+        session_id=session.get('session_id'),
+        request_info=info
+    )
+    await async_agent.run_blocking(
+        secure_data.log_activity,
+        user_id=session['username'],
+        activity_type="chat_message",
+        details=details,
+        request_info=info
+    )
+
+
+async def api_chat(scope, receive, send, session):
+    """Async /api/chat - same contract as the Flask route"""
+    message = await read_message(receive, send)
+    if message is None:
+        return
+    response = await async_agent.chat_with_family_member(session['username'], message)
+    await save_chat(session, message, response, request_info(scope), f"Message length: {len(message)} chars")
+    await send_json(send, {
+        'user_message': message,
+        'ai_response': response,
+        'timestamp': datetime.datetime.now().strftime("%H:%M"),
+        'user': session['display_name'],
+        'avatar': session['avatar']
+    })
+
+
+async def api_chat_stream(scope, receive, send, session):
+    """Async /api/chat/stream - Server-Sent Events, persisted after the stream"""
+    message = await read_message(receive, send)
+    if message is None:
+        return
+
+    def sse(payload, event=None):
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no")
+        ]
+    })
+    chunks = []
+    async for chunk in async_agent.chat_with_family_member_stream(session['username'], message):
+        chunks.append(chunk)
+        await send({"type": "http.response.body", "body": sse({'token': chunk}), "more_body": True})
+
+    response = "".join(chunks).strip()
+    try:
+        await send({"type": "http.response.body", "body": sse({
+            'user_message': message,
+            'ai_response': response,
+            'timestamp': datetime.datetime.now().strftime("%H:%M"),
+            'user': session['display_name'],
+            'avatar': session['avatar']
+        }, event='done')})
+    finally:
+        await save_chat(session, message, response, request_info(scope),
+                        f"Message length: {len(message)} chars (streamed)")
+
+
+async def api_conversation_starter(scope, receive, send, session):
+    """Async /api/conversation-starter"""
+    try:
+        starter = await async_agent.start_conversation(session['username'])
+        await send_json(send, {'starter': starter, 'timestamp': datetime.datetime.now().strftime("%H:%M")})
+    except Exception as e:
+        await send_json(send, {'starter': f"Hello {session['display_name']}! How are you today?", 'error': str(e)})
+
+
+ASYNC_ROUTES = {
+    ("POST", "/api/chat"): api_chat,
+    ("POST", "/api/chat/stream"): api_chat_stream,
+    ("GET", "/api/conversation-starter"): api_conversation_starter,
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await async_agent.close()
+            flask_asgi.executor.shutdown(wait=False, cancel_futures=True)
+            # Flush coalesced family data on clean shutdown
+            ai_chat_agent.memory_agent.close()
+            voice_handler.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application: native async handlers for chat, Flask for the rest"""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
+    handler = None
+    if scope["type"] == "http":
+        handler = ASYNC_ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        await flask_asgi(scope, receive, send)
+        return
+
+    session = load_session(scope)
+    if 'username' not in session:
+        await redirect_to_login(send)
+        return
+    await handler(scope, receive, send, session)
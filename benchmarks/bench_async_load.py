@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Async Load Benchmark
+Runs N concurrent chats against a slow mock LLM, once with a thread per
+request (like Flask's threaded server) and once with the asyncio agent,
+and reports memory and thread use of each
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+MOCK_SERVER = """
+import asyncio, sys
+from aiohttp import web
+
+async def chat(request):
+    await request.read()
+    await asyncio.sleep(float(sys.argv[2]))
+    return web.json_response({"message": {"role": "assistant", "content": "Sounds fun!"}, "done": True})
+
+app = web.Application()
+app.router.add_post("/api/chat", chat)
+web.run_app(app, host="127.0.0.1", port=int(sys.argv[1]), print=None)
+"""
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class Sampler(threading.Thread):
+    """Samples peak RSS and thread count while the load runs"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak_rss = rss_mb()
+        self.peak_threads = threading.active_count()
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak_rss = max(self.peak_rss, rss_mb())
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            time.sleep(0.01)
+
+
+def run_child(mode: str, concurrency: int, url: str):
+    from ai_powered_chat_agent import AIPoweredFamilyChatAgent
+    from async_chat_agent import AsyncAIPoweredFamilyChatAgent
+    from family_memory_agent import FamilyMemoryAgent
+
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        agent = AIPoweredFamilyChatAgent(ollama_url=url, memory_agent=FamilyMemoryAgent(data_path=tmp))
+        members = ["santosh", "maryne", "aditya", "avinav", "sushma", "meghna"]
+        jobs = [(members[i % len(members)], f"What should we do this weekend? #{i}") for i in range(concurrency)]
+        baseline = rss_mb()
+        sampler = Sampler()
+        sampler.start()
+        started = time.perf_counter()
+
+        if mode == "threads":
+            workers = [threading.Thread(target=agent.chat_with_family_member, args=job) for job in jobs]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        else:
+            async def load():
+                async_agent = AsyncAIPoweredFamilyChatAgent(agent, max_connections=concurrency)
+                await asyncio.gather(*(async_agent.chat_with_family_member(*job) for job in jobs))
+                await async_agent.close()
+            asyncio.run(load())
+
+        elapsed = time.perf_counter() - started
+        sampler.running = False
+        sampler.join()
+        agent.memory_agent.close()
+        print(json.dumps({
+            "seconds": round(elapsed, 2),
+            "rss_growth_mb": round(sampler.peak_rss - baseline, 1),
+            "peak_threads": sampler.peak_threads
+        }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--delay", type=float, default=2.0, help="mock generation time in seconds")
+    parser.add_argument("--port", type=int, default=18434)
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "CONCURRENCY", "URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.child[2])
+        return
+
+    url = f"http://127.0.0.1:{args.port}"
+    mock = subprocess.Popen([sys.executable, "-c", MOCK_SERVER, str(args.port), str(args.delay)])
+    try:
+        time.sleep(1.5)
+        print(f"{'mode':>8}{'concurrent':>12}{'seconds':>9}{'RSS +MB':>9}{'threads':>9}")
+        for concurrency in args.concurrency:
+            for mode in ("threads", "async"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, str(concurrency), url],
+                    capture_output=True, text=True, check=True
+                ).stdout.strip().splitlines()[-1]
+                result = json.loads(output)
+                print(f"{mode:>8}{concurrency:>12}{result['seconds']:>9}{result['rss_growth_mb']:>9}"
+                      f"{result['peak_threads']:>9}")
+    finally:
+        mock.terminate()
+
+
+if __name__ == "__main__":
+    main()
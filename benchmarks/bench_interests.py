@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Interest Matcher Benchmark
+Compares the trie matcher with the old per-keyword substring scan
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from interest_matcher import InterestMatcher
+
+FILLER = (
+    "i really like to spend the weekend with my family and we love talking about "
+    "school work dinner friends and what happened today at home"
+).split()
+
+
+def build_vocabulary(size, rng):
+    """`size` terms: single words and two/three word phrases, grouped 4 synonyms per interest"""
+    vocabulary = {}
+    for i in range(0, size, 4):
+        words = [f"topic{i + j}" for j in range(4)]
+        words[1] = f"{words[1]} club"
+        words[2] = f"{words[2]} world cup"
+        vocabulary[words[0]] = words[1:]
+    return vocabulary
+
+
+def naive_match(vocabulary, message):
+    """The original approach: lower() and a substring test per keyword"""
+    found = []
+    for interest, synonyms in vocabulary.items():
+        for term in [interest] + synonyms:
+            if term in message.lower() and interest not in found:
+                found.append(interest)
+    return found
+
+
+def build_messages(vocabulary, count, rng):
+    terms = [term for interest, synonyms in vocabulary.items() for term in [interest] + synonyms]
+    messages = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(8, 30)) + rng.sample(terms, 2)
+        rng.shuffle(words)
+        messages.append(" ".join(words))
+    return messages
+
+
+def throughput(match, messages):
+    start = time.perf_counter()
+    for message in messages:
+        match(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    print(f"{'terms':>8}{'build ms':>11}{'trie msg/s':>14}{'naive msg/s':>14}{'speedup':>10}")
+    for size in args.sizes:
+        vocabulary = build_vocabulary(size, rng)
+        start = time.perf_counter()
+        matcher = InterestMatcher(vocabulary)
+        build_ms = (time.perf_counter() - start) * 1000
+        messages = build_messages(vocabulary, args.messages, rng)
+
+        trie_rate = throughput(matcher.match, messages)
+        # The naive scan gets slow quickly; a sample is enough to measure it
+        naive_rate = throughput(lambda m: naive_match(vocabulary, m), messages[:max(20, 200000 // size)])
+        print(f"{matcher.term_count:>8}{build_ms:>11.1f}{trie_rate:>14,.0f}{naive_rate:>14,.0f}"
+              f"{trie_rate / naive_rate:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Ollama Router Benchmark
+Sends concurrent chats through the router to several local mock servers - one
+fast, one slow and one that fails for a while - and shows how traffic
+shifts, when the failing server is ejected and when it is re-admitted
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from ollama_router import OllamaRouter
+
+
+def mock_server(delay: float, failing: threading.Event):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if failing.is_set():
+                self._reply(503, {"error": "unavailable"})
+            else:
+                self._reply(200, {"models": [{"name": "gpt-oss:20b"}]})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            if failing.is_set():
+                self._reply(500, {"error": "model crashed"})
+                return
+            time.sleep(delay)
+            self._reply(200, {"message": {"role": "assistant", "content": "Hi!"}, "done": True})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--eject-seconds", type=float, default=2.0)
+    parser.add_argument("--probe-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    specs = [("fast", 0.02), ("slow", 0.08), ("flaky", 0.02)]
+    failing = {name: threading.Event() for name, _ in specs}
+    servers = {name: mock_server(delay, failing[name]) for name, delay in specs}
+    urls = {name: f"http://127.0.0.1:{server.server_address[1]}" for name, server in servers.items()}
+    names = {url: name for name, url in urls.items()}
+
+    router = OllamaRouter(list(urls.values()), eject_seconds=args.eject_seconds,
+                          probe_interval=args.probe_interval)
+    router.start()
+
+    errors = []
+    lock = threading.Lock()
+
+    def chat(i):
+        response = router.post("/api/chat", {"model": "gpt-oss:20b", "messages": [], "stream": False})
+        if response.status_code != 200:
+            with lock:
+                errors.append(i)
+
+    def snapshot(label: str):
+        stats = router.get_stats()["backends"]
+        print(f"\n{label}")
+        print(f"{'backend':>8}{'healthy':>9}{'requests':>10}{'errors':>8}{'ejections':>11}{'ewma ms':>9}")
+        for backend in stats:
+            print(f"{names[backend['url']]:>8}{str(backend['healthy']):>9}{backend['requests']:>10}"
+                  f"{backend['errors']:>8}{backend['ejections']:>11}{backend['latency_ewma_ms'] or 0:>9}")
+
+    third = args.requests // 3
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(chat, range(third)))
+        snapshot("Phase 1: all healthy (least outstanding favours the fast servers)")
+
+        failing["flaky"].set()
+        errors.clear()
+        list(pool.map(chat, range(third)))
+        snapshot(f"Phase 2: 'flaky' returns 500s ({len(errors)} client-visible errors before ejection)")
+
+        failing["flaky"].clear()
+        time.sleep(args.probe_interval * 2)
+        list(pool.map(chat, range(third)))
+        snapshot("Phase 3: 'flaky' recovered and was re-admitted by the active probe")
+
+    router.stop()
+    for server in servers.values():
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Prompt Prefix Benchmark
+Compares prompt-eval time of the old and new system prompt layouts against a
+mock Ollama server that reuses the cached prefix of the previous prompt
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from ollama_client import OllamaClient
+from prompt_builder import STATIC_PREFIX, PromptBuilder
+
+MEMBERS = ["santosh", "maryne", "aditya", "avinav", "sushma", "meghna"]
+TOPICS = ["cricket practice", "math homework", "piano lesson", "biryani recipe", "germany trip",
+          "science project", "birthday party", "new book", "football match", "coding club"]
+
+
+def legacy_prompt(member_name: str, member_context: str, family_context: str) -> str:
+    """The previous layout: member details in the middle of the instructions"""
+    head, guidelines = STATIC_PREFIX.split("\n\nCONVERSATION GUIDELINES:\n")
+    guidelines = guidelines.replace(
+        "- Address the family member you are talking with personally and warmly",
+        f"- Address {member_name.title()} personally and warmly"
+    )
+    return (
+        f"{head}\n\nCURRENT FAMILY CONTEXT:\n{family_context}\n\n"
+        f"CURRENT FAMILY MEMBER CONTEXT:\n{member_context}\n\n"
+        f"CONVERSATION GUIDELINES:\n{guidelines}"
+    )
+
+
+class MockOllama(BaseHTTPRequestHandler):
+    """Charges `ms_per_token` of prompt eval for every token after the longest
+    prefix shared with a prompt still held in one of the server's slots"""
+
+    protocol_version = "HTTP/1.1"
+    slots = []
+    num_slots = 1
+    ms_per_token = 0.5
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = "".join(message["content"] for message in request["messages"])
+
+        with self.lock:
+            best_slot, best_shared = 0, -1
+            for index, cached in enumerate(self.slots):
+                shared = len(os.path.commonprefix([cached, prompt]))
+                if shared > best_shared:
+                    best_slot, best_shared = index, shared
+            if len(self.slots) < self.num_slots:
+                self.slots.append(prompt)
+                best_shared = max(best_shared, 0)
+            else:
+                self.slots[best_slot] = prompt
+
+        tokens = len(prompt) // 4
+        evaluated = tokens - best_shared // 4
+        seconds = evaluated * self.ms_per_token / 1000
+        time.sleep(seconds)
+
+        body = json.dumps({
+            "message": {"role": "assistant", "content": "Hello!"},
+            "done": True,
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": int(seconds * 1e9),
+            "cached_tokens": tokens - evaluated
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def conversation(rng: random.Random, turns: int):
+    """(member, member_context, family_context) per turn; contexts drift as people chat"""
+    family_context = "Family members:\n" + "\n".join(
+        f"- {name.title()}: interests {', '.join(rng.sample(TOPICS, 3))}" for name in MEMBERS
+    )
+    history = {name: [] for name in MEMBERS}
+    member = rng.choice(MEMBERS)
+    for _ in range(turns):
+        if rng.random() < 0.4:
+            member = rng.choice(MEMBERS)
+        history[member].append(f"Talked about {rng.choice(TOPICS)} ({rng.randint(1, 999)})")
+        member_context = (
+            f"Name: {member.title()}\nInterests: {', '.join(TOPICS[:3])}\n"
+            "Recent conversations:\n" + "\n".join(history[member][-5:])
+        )
+        yield member, member_context, family_context
+
+
+def run(client: OllamaClient, prompts):
+    eval_ms, cached_share = [], []
+    for system_prompt, message in prompts:
+        response = client.post("/api/chat", {
+            "model": "mock", "stream": False,
+            "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": message}]
+        }).json()
+        eval_ms.append(response["prompt_eval_duration"] / 1e6)
+        total = response["prompt_eval_count"] + response["cached_tokens"]
+        cached_share.append(response["cached_tokens"] / total)
+    return eval_ms, cached_share
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--slots", type=int, default=1, help="like OLLAMA_NUM_PARALLEL")
+    parser.add_argument("--ms-per-token", type=float, default=0.5)
+    args = parser.parse_args()
+
+    MockOllama.num_slots = args.slots
+    MockOllama.ms_per_token = args.ms_per_token
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = OllamaClient(f"http://127.0.0.1:{server.server_address[1]}")
+
+    turns = list(conversation(random.Random(5), args.turns))
+    builder = PromptBuilder()
+    layouts = {
+        "legacy": [(legacy_prompt(*turn), "How was your day?") for turn in turns],
+        "prefix-first": [(builder.build(*turn), "How was your day?") for turn in turns],
+    }
+
+    print(f"{'layout':>13}{'eval p50 ms':>13}{'eval mean ms':>14}{'cached':>9}")
+    for name, prompts in layouts.items():
+        MockOllama.slots = []
+        eval_ms, cached_share = run(client, prompts)
+        print(f"{name:>13}{statistics.median(eval_ms):>13.1f}{statistics.mean(eval_ms):>14.1f}"
+              f"{statistics.mean(cached_share):>9.0%}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Retrieval Benchmark
+Measures top-k query latency of the local conversation retriever
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from history_store import MemberHistoryStore
+from semantic_retriever import ConversationRetriever
+
+TOPICS = [
+    "cricket match batting practice weekend", "homework math fractions school test",
+    "piano lesson music practice song", "dinner recipe biryani cooking tonight",
+    "trip to germany holiday flights", "voice audio microphone not working phone",
+    "quantum computing research ai models", "birthday party cake friends",
+]
+QUERIES = ["how was cricket practice", "help with my math homework", "my phone audio is broken",
+           "what should we cook for dinner", "planning the germany trip"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    rng = random.Random(3)
+
+    print(f"{'history':>9}{'load s':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MemberHistoryStore(tmp, segment_size=1000)
+            store.append_many("aditya", [
+                {
+                    "timestamp": "2025-08-21T10:00:00",
+                    "message": f"{rng.choice(TOPICS)} {rng.randint(0, 10 ** 6)}",
+                    "ai_response": rng.choice(TOPICS)
+                }
+                for _ in range(size)
+            ])
+            retriever = ConversationRetriever(store)
+
+            start = time.perf_counter()
+            retriever.top_k("aditya", "warm up")
+            load_seconds = time.perf_counter() - start
+
+            timings = []
+            for i in range(args.repeats):
+                start = time.perf_counter()
+                retriever.top_k("aditya", QUERIES[i % len(QUERIES)], k=3, exclude_last=2)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            print(f"{size:>9}{load_seconds:>9.2f}{statistics.median(timings):>9.2f}"
+                  f"{timings[int(len(timings) * 0.95) - 1]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Search Benchmark
+Builds the conversation search index over synthetic messages and times queries
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+from conversation_log import ConversationLog
+from search_index import ConversationSearchIndex
+
+MEMBERS = ["santosh", "maryne", "aditya", "avinav", "sushma", "meghna"]
+WORDS = (
+    "cricket football school homework music guitar piano dinner lunch breakfast garden "
+    "holiday germany india travel movie book reading science math art painting birthday "
+    "grandma cousin weekend park swimming football match coding robot quantum dream "
+    "voice audio microphone speaker phone laptop game puzzle chess story bedtime"
+).split()
+QUERIES = ["cricket", "audio microphone", "birthday grandma", "quantum robot coding", "piano", "weekend park swimming"]
+# Long tail of rarer words so the vocabulary looks like real chat
+RARE_WORDS = [f"word{i}" for i in range(20000)]
+
+
+def write_synthetic_log(path, count, seed=7):
+    rng = random.Random(seed)
+    # Zipf-like skew so some words are common and others rare
+    weights = [1.0 / (rank + 1) for rank in range(len(WORDS))]
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            words = rng.choices(WORDS, weights, k=rng.randint(3, 10)) + rng.choices(RARE_WORDS, k=rng.randint(2, 6))
+            message = " ".join(words)
+            entry = {
+                "timestamp": f"2025-08-{1 + i % 28:02d}T12:00:00",
+                "member": rng.choice(MEMBERS),
+                "message": message,
+                "ai_response": " ".join(rng.choices(WORDS, weights, k=8)),
+                "day": f"2025-08-{1 + i % 28:02d}"
+            }
+            f.write(json.dumps(entry) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "daily_conversations.jsonl")
+        print(f"Writing {args.messages:,} synthetic conversations...")
+        write_synthetic_log(log_path, args.messages)
+
+        index = ConversationSearchIndex(ConversationLog(log_path))
+        start = time.perf_counter()
+        index.catch_up()
+        print(f"Index build: {time.perf_counter() - start:.1f}s, {index.get_stats()}")
+
+        print(f"\n{'query':<28}{'member':<10}{'total':>9}{'p50 ms':>10}{'p95 ms':>10}")
+        for query in QUERIES:
+            for member in (None, "aditya"):
+                timings = []
+                for _ in range(args.repeats):
+                    result = index.search(query, member=member, page=2, per_page=10)
+                    timings.append(result['took_ms'])
+                timings.sort()
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(f"{query:<28}{member or '-':<10}{result['total']:>9}"
+                      f"{statistics.median(timings):>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
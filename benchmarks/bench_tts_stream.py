@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Streaming TTS Benchmark
+Compares time to first playable audio when a reply is rendered as one file
+versus sentence by sentence, using the real TTS worker pool
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'agents'))
+
+REPLY_SENTENCES = [
+    "Hello Aditya, it is so good to hear from you today!",
+    "I remember you were practising for the cricket match on Saturday.",
+    "How did the batting drills go with your coach this week?",
+    "If you want, we can make a little plan for the evenings before the match.",
+    "Maybe twenty minutes of catching practice and then some time for homework.",
+    "Avinav might enjoy bowling to you in the garden as well.",
+    "Tell me what worked best and I will remember it for next time.",
+    "Good luck, and have fun out there!"
+]
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(int(round(0.95 * (len(ordered) - 1))), len(ordered) - 1)]
+    return statistics.median(ordered) * 1000, p95 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    # Measure synthesis, not the cache; keep files out of family_data/audio
+    os.environ["TTS_CACHE_ENABLED"] = "false"
+    os.environ["TTS_WORKERS"] = str(args.workers)
+    os.environ["AUDIO_STORE_DIR"] = tempfile.mkdtemp(prefix="adinav-bench-audio-")
+    from voice_handler import VoiceHandler
+
+    voice = VoiceHandler()
+    # Start the worker processes before timing anything
+    if voice.create_audio_file("Warming up.") is None:
+        print("Speech synthesis is not working here (is a pyttsx3 engine such as espeak installed?)")
+        voice.close()
+        return
+
+    print(f"{'sentences':>10}{'file p50 ms':>13}{'stream p50 ms':>15}{'file p95 ms':>13}{'stream p95 ms':>15}"
+          f"{'failed':>8}")
+    for count in (2, 4, len(REPLY_SENTENCES)):
+        text = " ".join(REPLY_SENTENCES[:count])
+        file_times, stream_times = [], []
+        failed = 0
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            path = voice.create_audio_file(text, "aditya")
+            if path is None:
+                failed += 1
+            else:
+                file_times.append(time.perf_counter() - started)
+                os.remove(path)
+
+            started = time.perf_counter()
+            stream = voice.start_speech_stream(text, "aditya")
+            try:
+                stream.chunks[0].result()
+                stream_times.append(time.perf_counter() - started)
+                for chunk in stream.chunks:
+                    chunk.result()
+            except Exception:
+                failed += 1
+
+        if not file_times or not stream_times:
+            print(f"{count:>10}{'-':>13}{'-':>15}{'-':>13}{'-':>15}{failed:>8}")
+            continue
+        file_p50, file_p95 = percentiles(file_times)
+        stream_p50, stream_p95 = percentiles(stream_times)
+        print(f"{count:>10}{file_p50:>13.0f}{stream_p50:>15.0f}{file_p95:>13.0f}{stream_p95:>15.0f}{failed:>8}")
+
+    voice.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,20 +6,24 @@ AdinavAI Complete Family App
 - Single interface for all family members
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context, send_from_directory, abort
 import sys
 import os
 import hashlib
 import datetime
+import json
 import logging
 import sqlite3
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from functools import wraps
 from cryptography.fernet import Fernet
+from werkzeug.wsgi import ClosingIterator
 
 # Add agents directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
 from ai_powered_chat_agent import AIPoweredFamilyChatAgent
 from voice_handler import VoiceHandler
+from audio_transcoder import FORMATS, audio_format, audio_mimetype
 
 app = Flask(__name__)
 
@@ -40,11 +44,11 @@ def get_or_create_flask_secret_key():
         f.write(key_bytes)
     return key_bytes
 
-app.secret_key = get_or_create_flask_secret_key()
-
-# Initialize AI agent and voice handler
-ai_chat_agent = AIPoweredFamilyChatAgent()
-voice_handler = VoiceHandler()
+# AI agent, voice handler and secure storage, created by create_app().
+# Importing this module must stay free of side effects: TTS worker
+# processes re-import it as __mp_main__ when started with spawn.
+ai_chat_agent = None
+voice_handler = None
 
 # Family credentials - Secure storage with encrypted passwords
 FAMILY_USERS = {
@@ -292,8 +296,19 @@ class SecureDataManager:
             self.logger.error(f"Error retrieving conversations: {e}")
             return []
 
-# Initialize secure data manager
-secure_data = SecureDataManager()
+secure_data = None
+
+def create_app():
+    """Initialize the app's services once and return the Flask app"""
+    global ai_chat_agent, voice_handler, secure_data
+    if ai_chat_agent is None:
+        app.secret_key = get_or_create_flask_secret_key()
+        ai_chat_agent = AIPoweredFamilyChatAgent()
+        ai_chat_agent.memory_agent.start_background_compaction()
+        voice_handler = VoiceHandler()
+        voice_handler.audio_store.start_sweeper()
+        secure_data = SecureDataManager()
+    return app
 
 def login_required(f):
     """Decorator to require login for routes"""
@@ -441,6 +456,73 @@ def api_chat():
             'ai_response': f"I'm experiencing technical difficulties, {session.get('display_name', 'there')}, but I'm still here for you!"
         }), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+@login_required
+def api_chat_stream():
+    """Stream the AI reply as Server-Sent Events - Securely logged after the stream"""
+    data = request.get_json(silent=True) or {}
+    message = data.get('message', '').strip()
+    
+    # Input validation
+    if not message:
+        return jsonify({'error': 'No message provided'}), 400
+    if len(message) > 1000:
+        return jsonify({'error': 'Message too long (max 1000 characters)'}), 400
+    
+    # Read everything needed from the request before streaming starts
+    username = session['username']
+    session_id = session.get('session_id')
+    display_name = session['display_name']
+    avatar = session['avatar']
+    request_info = {
+        'ip': request.remote_addr,
+        'user_agent': request.headers.get('User-Agent', '')
+    }
+    
+    def sse(payload, event=None):
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(payload)}\n\n"
+    
+    def generate():
+        chunks = []
+        for chunk in ai_chat_agent.chat_with_family_member_stream(username, message):
+            chunks.append(chunk)
+            yield sse({'token': chunk})
+        
+        response = "".join(chunks).strip()
+        try:
+            yield sse({
+                'user_message': message,
+                'ai_response': response,
+                'timestamp': datetime.datetime.now().strftime("%H:%M"),
+                'user': display_name,
+                'avatar': avatar
+            }, event='done')
+        finally:
+            # The browser has the full reply (even if it hung up right after); persist it now
+            secure_data.save_conversation(
+                user_id=username,
+                user_message=message,
+                ai_response=response,
+                session_id=session_id,
+                request_info=request_info
+            )
+            secure_data.log_activity(
+                user_id=username,
+                activity_type="chat_message",
+                details=f"Message length: {len(message)} chars (streamed)",
+                request_info=request_info
+            )
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 @app.route('/api/voice-to-text', methods=['POST'])
 @login_required  
 def voice_to_text():
@@ -479,6 +561,9 @@ def text_to_voice():
         data = request.get_json(silent=True) or {}
         text = data.get('text', '')
         family_member = session.get('username', 'default')
+        # Clients list the audio types they can play in Accept
+        # (e.g. "application/json, audio/ogg, audio/mpeg;q=0.8"); WAV otherwise
+        fmt = voice_handler.transcoder.negotiate(request.headers.get('Accept'))
         
         if not text:
             return jsonify({
@@ -486,26 +571,39 @@ def text_to_voice():
                 'error': 'No text provided'
             }), 400
         
+        if voice_handler.tts_cache is not None:
+            # Same text and voice -> same file and URL, so repeats skip synthesis
+            audio_filename = voice_handler.create_cached_audio_file(text, family_member, fmt)
+            if not audio_filename:
+                return jsonify({
+                    'success': False,
+                    'error': 'Failed to generate audio'
+                })
+            response = jsonify({
+                'success': True,
+                'audio_url': url_for('tts_audio', filename=audio_filename),
+                'audio_format': fmt,
+                'message': 'Voice synthesis complete'
+            })
+            response.vary.add('Accept')
+            return response
+        
         # Create audio file
-        audio_path = voice_handler.create_audio_file(text, family_member)
+        audio_path = voice_handler.create_audio_file(text, family_member, fmt)
         
         if audio_path:
-            # Move to static directory for serving
-            static_audio_dir = "static/audio"
-            os.makedirs(static_audio_dir, exist_ok=True)
-            
-            audio_filename = f"response_{family_member}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-            static_audio_path = os.path.join(static_audio_dir, audio_filename)
-            
-            # Copy file to static directory
-            import shutil
-            shutil.move(audio_path, static_audio_path)
+            # Hand the file to the audio store, which bounds disk use
+            audio_id = voice_handler.audio_store.add(audio_path, family_member,
+                                                     extension=FORMATS[fmt]['extension'])
             
-            return jsonify({
+            response = jsonify({
                 'success': True,
-                'audio_url': f"/static/audio/{audio_filename}",
+                'audio_url': url_for('stored_audio', audio_id=audio_id),
+                'audio_format': fmt,
                 'message': 'Voice synthesis complete'
             })
+            response.vary.add('Accept')
+            return response
         else:
             return jsonify({
                 'success': False,
@@ -518,6 +616,101 @@ def text_to_voice():
             'error': str(e)
         }), 500
 
+@app.route('/api/text-to-voice/stream', methods=['POST'])
+@login_required
+def text_to_voice_stream():
+    """Start sentence-by-sentence synthesis and return the playlist at once
+    
+    Each playlist URL waits until its sentence is rendered and then
+    redirects to the audio, so a client can start playing the first URL
+    while the later sentences are still being synthesized.
+    """
+    data = request.get_json(silent=True) or {}
+    text = data.get('text', '')
+    family_member = session.get('username', 'default')
+    
+    if not text:
+        return jsonify({
+            'success': False,
+            'error': 'No text provided'
+        }), 400
+    
+    fmt = voice_handler.transcoder.negotiate(request.headers.get('Accept'))
+    stream = voice_handler.start_speech_stream(text, family_member, fmt)
+    if stream is None:
+        return jsonify({
+            'success': False,
+            'error': 'Nothing to speak'
+        }), 400
+    
+    response = jsonify({
+        'success': True,
+        'stream_id': stream.id,
+        'playlist': [url_for('speech_chunk', stream_id=stream.id, index=i) for i in range(len(stream.chunks))],
+        'audio_format': fmt,
+        'message': 'Voice synthesis started'
+    })
+    response.vary.add('Accept')
+    return response
+
+@app.route('/audio/stream/<stream_id>/<int:index>')
+@login_required
+def speech_chunk(stream_id, index):
+    """Wait for one sentence of a speech stream, then redirect to its audio"""
+    stream = voice_handler.speech_streams.get(stream_id)
+    if stream is None or index >= len(stream.chunks):
+        abort(404)
+    try:
+        kind, name = stream.chunks[index].result(timeout=int(os.environ.get("TTS_CHUNK_TIMEOUT", 60)))
+    except FutureTimeoutError:
+        return jsonify({'success': False, 'error': 'Voice synthesis timed out'}), 504
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    if kind == 'tts':
+        return redirect(url_for('tts_audio', filename=name))
+    return redirect(url_for('stored_audio', audio_id=name))
+
+def count_audio_bytes(response, filename):
+    """Bytes on the wire per audio format (304 revalidations send none)"""
+    if response.status_code in (200, 206) and response.content_length:
+        voice_handler.transcoder.record_served(audio_format(filename) or 'other', response.content_length)
+
+@app.route('/audio/tts/<filename>')
+@login_required
+def tts_audio(filename):
+    """Serve cached speech; the name is a content hash, so it never changes"""
+    if voice_handler.tts_cache is None:
+        abort(404)
+    response = send_from_directory(os.path.abspath(voice_handler.tts_cache.cache_dir), filename,
+                                   mimetype=audio_mimetype(filename), max_age=365 * 24 * 3600)
+    count_audio_bytes(response, filename)
+    # Family audio: browsers may keep it, shared caches may not
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/audio/clips/<audio_id>')
+@login_required
+def stored_audio(audio_id):
+    """Serve a stored audio file, pinned against sweeping until sent"""
+    store = voice_handler.audio_store
+    if not store.acquire(audio_id):
+        abort(404)
+    try:
+        response = send_from_directory(os.path.abspath(store.root), audio_id,
+                                       mimetype=audio_mimetype(audio_id), max_age=int(store.max_age_seconds))
+    except Exception:
+        store.release(audio_id)
+        raise
+    count_audio_bytes(response, audio_id)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    # send_file passes the file straight to the server, bypassing Response.close,
+    # so unpin when the server closes the body iterable
+    response.response = ClosingIterator(response.response, lambda: store.release(audio_id))
+    return response
+
 @app.route('/api/voice-capabilities')
 @login_required
 def api_voice_capabilities():
@@ -546,7 +739,7 @@ def api_family_info():
         'user': session,
         'context': context,
         'family_members': len(FAMILY_USERS),
-        'ai_status': ai_chat_agent.test_ai_connection(),
+        'ai_status': ai_chat_agent.test_ai_connection(),  # cached, never blocks
         'voice_available': True,
         'is_admin': is_admin
     }
@@ -563,6 +756,30 @@ def api_family_info():
     
     return jsonify(response_data)
 
+@app.route('/api/search')
+@login_required
+def api_search():
+    """Search past family conversations"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'No search query provided'}), 400
+    if len(query) > 200:
+        return jsonify({'error': 'Search query too long (max 200 characters)'}), 400
+    
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 10)), 1), 50)
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be numbers'}), 400
+    
+    # Members search their own conversations; the admin may search anyone's
+    member = session['username']
+    if session.get('role') == 'admin':
+        member = request.args.get('member') or None
+    
+    results = ai_chat_agent.memory_agent.search_conversations(query, member_name=member, page=page, per_page=per_page)
+    return jsonify(results)
+
 @app.route('/api/conversation-starter')
 @login_required
 def api_conversation_starter():
@@ -584,10 +801,29 @@ def api_conversation_starter():
 @app.route('/health')
 def health():
     """Health check for the app"""
+    # Set by asgi_app.py when serving through uvicorn
+    async_agent = app.config.get('ASYNC_CHAT_AGENT')
+    ai_health = ai_chat_agent.get_ai_health()
     return jsonify({
         'status': 'healthy',
-        'ai_connected': ai_chat_agent.test_ai_connection(),
+        'ai_connected': ai_health['connected'],
+        'ai_health': ai_health,
         'active_users': len([k for k in session.keys() if k == 'username']),
+        'persistence': ai_chat_agent.memory_agent.get_persistence_stats(),
+        'context_cache': ai_chat_agent.memory_agent.get_context_cache_stats(),
+        'compaction': ai_chat_agent.memory_agent.get_compaction_report(),
+        'chat_latency': ai_chat_agent.get_latency_stats(),
+        'ollama_client': ai_chat_agent.get_ollama_stats(),
+        'response_cache': ai_chat_agent.get_response_cache_stats(),
+        'semantic_cache': ai_chat_agent.get_semantic_cache_stats(),
+        'single_flight': ai_chat_agent.get_single_flight_stats(),
+        'circuit_breaker': ai_chat_agent.get_circuit_breaker_stats(),
+        'tts_pool': voice_handler.get_tts_stats(),
+        'tts_cache': voice_handler.get_tts_cache_stats(),
+        'audio_store': voice_handler.get_audio_store_stats(),
+        'tts_latency': voice_handler.get_tts_latency_stats(),
+        'audio_transcoder': voice_handler.get_transcoder_stats(),
+        'async_agent': async_agent.get_stats() if async_agent else None,
         'timestamp': datetime.datetime.now().isoformat()
     })
 
@@ -596,9 +832,11 @@ if __name__ == '__main__':
     print("AdinavAI Complete Family App Starting...")
     print("=" * 70)
     
+    create_app()
+    
     # Test AI connection
     print("Testing AI connection...")
-    if ai_chat_agent.test_ai_connection():
+    if ai_chat_agent.test_ai_connection(refresh=True):
         print("AI model (GPT-OSS 20B) is ready!")
     else:
         print("AI model not ready yet. Basic features available.")
@@ -631,4 +869,8 @@ if __name__ == '__main__':
             print(f"Port {port} is busy, trying port {port + 1}")
             app.run(debug=debug_mode, host='0.0.0.0', port=port + 1, threaded=True)
         else:
-            raise e
\ No newline at end of file
+            raise e
+    finally:
+        # Flush coalesced family data on clean shutdown
+        ai_chat_agent.memory_agent.close()
+        voice_handler.close()
\ No newline at end of file
@@ -8,10 +8,12 @@ import subprocess
 import sys
 import os
 import time
-import requests
 import socket
 from pathlib import Path
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agents'))
+from ollama_client import get_ollama_client
+
 def find_free_port():
     """Find a free port starting from 8080"""
     for port in [8080, 5000, 3000, 8000, 8888, 9000]:
@@ -25,11 +27,8 @@ def find_free_port():
 
 def check_ollama_running():
     """Check if Ollama is already running"""
-    try:
-        response = requests.get('http://localhost:11434/api/tags', timeout=3)
-        return response.status_code == 200
-    except:
-        return False
+    # No retries here: start_ollama() already polls while the server boots
+    return get_ollama_client().is_available(timeout=3, retries=0)
 
 def start_ollama():
     """Start Ollama if not already running"""
@@ -46,7 +46,6 @@ def create_family_data_if_needed():
                     "role": "father",
                     "interests": ["AI", "quantum computing", "family", "learning", "dreams"],
                     "personality": "curious, loving, ambitious, dedicated family man",
-                    "conversation_history": [],
                     "preferences": {},
                     "memories": []
                 },
@@ -55,7 +54,6 @@ def create_family_data_if_needed():
                     "role": "mother",
                     "interests": [],
                     "personality": "to_be_learned",
-                    "conversation_history": [],
                     "preferences": {},
                     "memories": []
                 },
@@ -65,7 +63,6 @@ def create_family_data_if_needed():
                     "age_group": "child",
                     "interests": [],
                     "personality": "to_be_learned",
-                    "conversation_history": [],
                     "preferences": {},
                     "memories": []
                 },
@@ -75,7 +72,6 @@ def create_family_data_if_needed():
                     "age_group": "child",
                     "interests": [],
                     "personality": "to_be_learned",
-                    "conversation_history": [],
                     "preferences": {},
                     "memories": []
                 }
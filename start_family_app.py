@@ -59,11 +59,11 @@ def check_ai_model():
     print("\n🧠 Checking AI model availability...")
     
     try:
-        import requests
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        if response.status_code == 200:
-            models = response.json()
-            model_names = [model['name'] for model in models.get('models', [])]
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agents'))
+        from ollama_client import get_ollama_client
+        client = get_ollama_client()
+        if client.is_available(timeout=5):
+            model_names = client.list_models()
             
             if 'gpt-oss:20b' in model_names:
                 print("  ✓ Ollama is running")
@@ -89,7 +89,8 @@ def start_application():
     
     try:
         # Run the family app
-        from family_app import app
+        from family_app import create_app
+        app = create_app()
         
         print("🌐 Family app is running at:")
         print("   http://localhost:5000")
@@ -4,18 +4,19 @@ AdinavAI System Health Check
 Quick diagnostic script to verify all components are working
 """
 
-import requests
 import subprocess
 import sys
 import os
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agents'))
+
 def check_ollama_running():
     """Check if Ollama is running and accessible"""
     try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        return response.status_code == 200
-    except:
+        from ollama_client import get_ollama_client
+    except ImportError:
         return False
+    return get_ollama_client().is_available(timeout=5)
 
 def check_ollama_models():
     """Check what models are available"""
@@ -69,10 +70,9 @@ def main():
     
     # Test AI Connection
     try:
-        sys.path.append('agents')
         from ai_powered_chat_agent import AIPoweredFamilyChatAgent
         agent = AIPoweredFamilyChatAgent()
-        if agent.test_ai_connection():
+        if agent.test_ai_connection(refresh=True):
             print("✅ AI Agent connection: WORKING")
         else:
             print("❌ AI Agent connection: FAILED")
@@ -45,7 +45,7 @@ def test_ai_agent():
         ai_agent = AIPoweredFamilyChatAgent()
         
         # Test connection
-        if ai_agent.test_ai_connection():
+        if ai_agent.test_ai_connection(refresh=True):
             print("✓ AI agent connection successful!")
             
             # Test conversation with Santosh
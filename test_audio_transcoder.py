@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Audio Transcoder Test Script
+Checks Accept header negotiation of the speech audio format
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
+
+from audio_transcoder import AudioTranscoder, audio_mimetype
+
+BROWSER_ACCEPT = "application/json, audio/ogg, audio/mpeg, audio/wav;q=0.5"
+
+
+def make_transcoder(**encoders) -> AudioTranscoder:
+    """A transcoder with exactly the given encoders, whatever is on the PATH"""
+    transcoder = AudioTranscoder(workers=1)
+    transcoder.encoders = encoders
+    return transcoder
+
+
+def test_most_compact_accepted_format_wins():
+    """A browser that plays Ogg/Opus and MP3 gets Opus when both encoders exist"""
+    transcoder = make_transcoder(opus='opusenc', mp3='lame')
+    try:
+        assert transcoder.negotiate(BROWSER_ACCEPT) == 'opus'
+        assert transcoder.negotiate("audio/mpeg, audio/wav") == 'mp3'
+    finally:
+        transcoder.close()
+
+
+def test_quality_values_are_respected():
+    transcoder = make_transcoder(opus='opusenc', mp3='lame')
+    try:
+        assert transcoder.negotiate("audio/ogg;q=0.2, audio/mpeg") == 'mp3'
+        assert transcoder.negotiate("audio/ogg;q=0, audio/wav") == 'wav'
+    finally:
+        transcoder.close()
+
+
+def test_missing_encoder_falls_back():
+    """Formats we can't encode are skipped, ending at WAV"""
+    transcoder = make_transcoder(mp3='lame')
+    try:
+        assert transcoder.negotiate(BROWSER_ACCEPT) == 'mp3'
+        assert transcoder.negotiate("audio/ogg") == 'wav'
+    finally:
+        transcoder.close()
+
+
+def test_unnamed_formats_get_wav():
+    """Wildcards, WebM and a missing header get WAV; we only produce Ogg, MP3 and WAV"""
+    transcoder = make_transcoder(opus='opusenc', mp3='lame')
+    try:
+        for accept in [None, "", "*/*", "audio/*", "audio/webm", "application/json"]:
+            assert transcoder.negotiate(accept) == 'wav', accept
+    finally:
+        transcoder.close()
+
+
+def test_mimetype_matches_extension():
+    assert audio_mimetype("reply.ogg") == 'audio/ogg'
+    assert audio_mimetype("reply.mp3") == 'audio/mpeg'
+    assert audio_mimetype("reply.wav") == 'audio/wav'
+    assert audio_mimetype("reply.bin") == 'application/octet-stream'
+
+
+def main():
+    """Run all audio transcoder tests"""
+    print("🧪 Testing audio format negotiation...")
+    tests = [test_most_compact_accepted_format_wins, test_quality_values_are_respected,
+             test_missing_encoder_falls_back, test_unnamed_formats_get_wav, test_mimetype_matches_extension]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__ or test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__doc__ or test.__name__}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+AdinavAI File Locking Test Script
+Checks the cross-process family_data lock and atomic JSON writes
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
+
+from file_locking import InterProcessLock, atomic_write_json
+
+
+def _increment(lock_path: str, counter_path: str, times: int):
+    """Read-modify-write a counter file under the lock (runs in a child process)"""
+    lock = InterProcessLock(lock_path)
+    for _ in range(times):
+        with lock:
+            with open(counter_path, "r", encoding="utf-8") as f:
+                value = int(f.read())
+            with open(counter_path, "w", encoding="utf-8") as f:
+                f.write(str(value + 1))
+
+
+def test_lock_serializes_processes():
+    """Four processes incrementing one file under the lock lose no updates"""
+    directory = tempfile.mkdtemp(prefix="adinav-lock-")
+    lock_path = os.path.join(directory, ".lock")
+    counter_path = os.path.join(directory, "counter")
+    with open(counter_path, "w", encoding="utf-8") as f:
+        f.write("0")
+
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_increment, args=(lock_path, counter_path, 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    with open(counter_path, "r", encoding="utf-8") as f:
+        assert int(f.read()) == 200
+
+
+def test_lock_is_reentrant_and_excludes_other_threads():
+    """Nested use in one thread works; another thread waits until it is released"""
+    lock = InterProcessLock(os.path.join(tempfile.mkdtemp(prefix="adinav-lock-"), ".lock"))
+    entered = threading.Event()
+
+    def other_thread():
+        with lock:
+            entered.set()
+
+    with lock:
+        with lock:
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            assert not entered.wait(0.2)
+    assert entered.wait(5)
+    thread.join()
+
+
+def test_atomic_write_keeps_permissions():
+    """Rewriting a file keeps its mode; a new file gets 0644"""
+    path = os.path.join(tempfile.mkdtemp(prefix="adinav-lock-"), "data.json")
+    atomic_write_json(path, {'version': 1})
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    os.chmod(path, 0o640)
+    atomic_write_json(path, {'version': 2})
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f) == {'version': 2}
+    assert os.listdir(os.path.dirname(path)) == ["data.json"]
+
+
+def main():
+    """Run all file locking tests"""
+    print("🧪 Testing file locking...")
+    tests = [test_lock_serializes_processes, test_lock_is_reentrant_and_excludes_other_threads,
+             test_atomic_write_keeps_permissions]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__ or test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__doc__ or test.__name__}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Interest Matcher Test Script
+Checks that ordinary sentences don't add interests and real likes still do
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
+
+from interest_matcher import InterestMatcher
+
+VOCABULARY_FILE = os.path.join(os.path.dirname(__file__), 'family_data', 'interest_vocabulary.json')
+
+
+def test_ordinary_sentences_add_no_interest():
+    """Greetings, school and everyday words are not interests"""
+    matcher = InterestMatcher.from_file(VOCABULARY_FILE)
+    for message in [
+        "Hi AI, can you help me with something?",
+        "I have a German test and a Hindi exam tomorrow",
+        "There is no space left in my school bag",
+        "We went bowling and then played in the garden",
+        "I'm reading my homework instructions now",
+        "It looks like space is cold"
+    ]:
+        assert matcher.match(message) == [], message
+
+
+def test_liked_terms_match_after_a_liking_cue():
+    """Ambiguous words count once the member says they like them"""
+    matcher = InterestMatcher.from_file(VOCABULARY_FILE)
+    assert matcher.match("I love learning German") == ["languages"]
+    assert matcher.match("I really like space and the stars") == ["science"]
+    assert matcher.match("I'm into AI these days") == ["AI"]
+
+
+def test_unambiguous_terms_always_match():
+    matcher = InterestMatcher.from_file(VOCABULARY_FILE)
+    assert matcher.match("We watched the cricket and then played chess") == ["cricket", "games"]
+    assert matcher.match("Tell me about machine learning") == ["AI"]
+
+
+def test_list_vocabulary_still_matches_interest_names():
+    """The plain list format keeps matching the interest name itself"""
+    matcher = InterestMatcher({"art": ["drawing"]})
+    assert matcher.match("I did some art today") == ["art"]
+    assert matcher.match("It was a fun party") == []
+
+
+def main():
+    """Run all interest matcher tests"""
+    print("🧪 Testing interest matcher...")
+    tests = [test_ordinary_sentences_add_no_interest, test_liked_terms_match_after_a_liking_cue,
+             test_unambiguous_terms_always_match, test_list_vocabulary_still_matches_interest_names]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__ or test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__doc__ or test.__name__}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
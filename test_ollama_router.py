@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Ollama Router Test Script
+Checks backend ejection, probing and how streamed requests are released
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
+
+from ollama_router import OllamaRouter
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    """Stands in for OllamaClient; `up` decides whether /api/tags answers"""
+
+    def __init__(self, url: str, status_code: int = 200):
+        self.base_url = url
+        self.status_code = status_code
+        self.up = True
+
+    def post(self, path, payload, stream=False, read_timeout=None):
+        return FakeResponse(self.status_code)
+
+    def is_available(self, timeout=3, retries=None):
+        return self.up
+
+
+def make_router(count: int = 2, **kwargs) -> OllamaRouter:
+    router = OllamaRouter([f"http://ollama-{i}:11434" for i in range(count)], **kwargs)
+    for backend in router.backends:
+        backend.client = FakeClient(backend.url)
+    return router
+
+
+def fail(router: OllamaRouter, backend, times: int):
+    for _ in range(times):
+        backend.outstanding += 1
+        router.release(backend, 1.0, True)
+
+
+def test_failing_backend_is_ejected():
+    """Three consecutive failures eject a backend; traffic goes to the other one"""
+    router = make_router(eject_after=3)
+    sick, healthy = router.backends
+    fail(router, sick, 2)
+    assert router.acquire() is sick
+    router.release(sick, 1.0, True)
+    assert sick.ejections == 1
+    assert all(router.acquire() is healthy for _ in range(3))
+
+
+def test_answered_probe_does_not_readmit():
+    """/api/tags answering neither ends an ejection early nor clears failures"""
+    router = make_router(eject_after=3, eject_seconds=60)
+    sick = router.backends[0]
+    fail(router, sick, 3)
+    ejected_until = sick.ejected_until
+    router.probe_once()
+    assert sick.ejected_until == ejected_until
+    assert sick.consecutive_failures == 3
+
+
+def test_backend_returns_after_ejection_window():
+    """Once the window has passed the backend gets traffic again, and one more failure re-ejects it"""
+    router = make_router(count=1, eject_after=3)
+    backend = router.backends[0]
+    fail(router, backend, 3)
+    backend.ejected_until = 0.0
+    assert router.acquire() is backend
+    router.release(backend, 1.0, True)
+    assert backend.ejections == 2
+    assert backend.ejected_until > 0
+
+
+def test_failed_probe_counts_as_failure():
+    router = make_router(eject_after=2)
+    sick = router.backends[0]
+    sick.client.up = False
+    router.probe_once()
+    router.probe_once()
+    assert sick.ejections == 1
+
+
+def test_stream_released_with_its_real_outcome():
+    """A stream that breaks after its headers counts as a failure"""
+    router = make_router(count=1)
+    backend = router.backends[0]
+    response = router.post("/api/chat", {}, stream=True)
+    assert backend.outstanding == 1
+    router.finish_stream(response, True)
+    response.close()
+    assert backend.outstanding == 0
+    assert backend.errors == 1 and backend.consecutive_failures == 1
+
+
+def test_abandoned_stream_has_no_verdict():
+    """Closing a stream the client walked away from releases it without judging the backend"""
+    router = make_router(count=1)
+    backend = router.backends[0]
+    backend.consecutive_failures = 2
+    response = router.post("/api/chat", {}, stream=True)
+    response.close()
+    assert response.closed
+    assert backend.outstanding == 0
+    assert backend.errors == 0 and backend.consecutive_failures == 2
+    assert backend.ewma_seconds is None
+
+
+def test_finished_stream_feeds_latency():
+    router = make_router(count=1)
+    backend = router.backends[0]
+    backend.consecutive_failures = 2
+    response = router.post("/api/chat", {}, stream=True)
+    router.finish_stream(response, False)
+    router.finish_stream(response, True)  # Only the first verdict counts
+    response.close()
+    assert backend.outstanding == 0
+    assert backend.consecutive_failures == 0 and backend.errors == 0
+    assert backend.ewma_seconds is not None
+
+
+def main():
+    """Run all Ollama router tests"""
+    print("🧪 Testing Ollama router...")
+    tests = [test_failing_backend_is_ejected, test_answered_probe_does_not_readmit,
+             test_backend_returns_after_ejection_window, test_failed_probe_counts_as_failure,
+             test_stream_released_with_its_real_outcome, test_abandoned_stream_has_no_verdict,
+             test_finished_stream_feeds_latency]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__ or test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__doc__ or test.__name__}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Semantic Cache Test Script
+Checks that near-identical questions reuse an answer and different ones don't
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
+
+from family_memory_agent import FamilyMemoryAgent
+from semantic_cache import SemanticResponseCache
+
+FAMILY_DATA = os.path.join(os.path.dirname(__file__), 'family_data')
+
+HOMEWORK_QUESTION = "Can you help me make a plan to finish my math homework that is due on Monday?"
+HOMEWORK_ANSWER = "Let's split the Monday math homework into three short sessions."
+
+
+def test_rephrased_question_hits():
+    """Same content words, different stopwords and punctuation: reuse the answer"""
+    cache = SemanticResponseCache()
+    cache.store("aditya", HOMEWORK_QUESTION, HOMEWORK_ANSWER)
+    rephrased = "can you help me make a plan to finish the math homework that is due on Monday"
+    assert cache.lookup("aditya", rephrased) == HOMEWORK_ANSWER
+
+
+def test_one_word_near_miss():
+    """A long question that differs by one content word must not get the cached answer"""
+    cache = SemanticResponseCache()
+    cache.store("aditya", HOMEWORK_QUESTION, HOMEWORK_ANSWER)
+    tuesday = HOMEWORK_QUESTION.replace("Monday", "Tuesday")
+    assert cache.lookup("aditya", tuesday) is None
+    assert cache.lookup("aditya", HOMEWORK_QUESTION.replace("math", "science")) is None
+
+
+def test_answers_are_per_member():
+    cache = SemanticResponseCache()
+    cache.store("aditya", HOMEWORK_QUESTION, HOMEWORK_ANSWER)
+    assert cache.lookup("avinav", HOMEWORK_QUESTION) is None
+
+
+def test_hit_after_ordinary_chat_turn():
+    """Ordinary chat turns don't make earlier answers stale; learning interests does"""
+    with tempfile.TemporaryDirectory() as root:
+        data_path = os.path.join(root, 'family_data')
+        shutil.copytree(FAMILY_DATA, data_path, ignore=shutil.ignore_patterns('audio', 'history', '*.jsonl'))
+        memory = FamilyMemoryAgent(data_path, process_lock=False)
+        try:
+            cache = SemanticResponseCache()
+            cache.store("aditya", HOMEWORK_QUESTION, HOMEWORK_ANSWER, memory.profile_version("aditya"))
+            for city in ["Tokyo", "Delhi", "Berlin", "Lima", "Oslo"]:
+                memory.remember_conversation("aditya", f"What time is it in {city}?", "Let me check.")
+            assert cache.lookup("aditya", HOMEWORK_QUESTION, memory.profile_version("aditya")) == HOMEWORK_ANSWER
+
+            for message in ["I love playing chess", "I love swimming", "I love painting", "I love yoga"]:
+                memory.remember_conversation("aditya", message, "Nice!")
+            assert cache.lookup("aditya", HOMEWORK_QUESTION, memory.profile_version("aditya")) is None
+        finally:
+            memory.close()
+
+
+def main():
+    """Run all semantic cache tests"""
+    print("🧪 Testing semantic response cache...")
+    tests = [test_rephrased_question_hits, test_one_word_near_miss, test_answers_are_per_member,
+             test_hit_after_ordinary_chat_turn]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__ or test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__doc__ or test.__name__}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
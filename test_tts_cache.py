@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+AdinavAI TTS Cache Test Script
+Checks that pinned entries survive eviction until they are released
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
+
+from tts_cache import TTSAudioCache
+
+
+def render_bytes(size: int):
+    def render(path: str):
+        with open(path, 'wb') as f:
+            f.write(b'\0' * size)
+    return render
+
+
+def test_least_recently_used_entry_is_evicted():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TTSAudioCache(cache_dir, max_bytes=250)
+        for name in ['a.wav', 'b.wav', 'c.wav']:
+            cache.get_or_create(name, render_bytes(100))
+        assert not os.path.exists(cache.path('a.wav'))
+        assert os.path.exists(cache.path('b.wav')) and os.path.exists(cache.path('c.wav'))
+
+
+def test_pinned_entry_survives_eviction():
+    """A WAV being encoded stays on disk while newer entries push the cache over its limit"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TTSAudioCache(cache_dir, max_bytes=250)
+        with cache.pinned('source.wav', render_bytes(100)) as wav_path:
+            for name in ['b.opus', 'c.opus', 'd.opus']:
+                cache.get_or_create(name, render_bytes(100))
+            assert os.path.exists(wav_path)
+            assert not os.path.exists(cache.path('b.opus'))
+        # Once released it is the least recently used entry again
+        cache.get_or_create('e.opus', render_bytes(100))
+        assert not os.path.exists(wav_path)
+        assert os.path.exists(cache.path('d.opus'))
+
+
+def test_pinned_renders_missing_entry():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TTSAudioCache(cache_dir)
+        with cache.pinned('new.wav', render_bytes(10)) as wav_path:
+            assert os.path.getsize(wav_path) == 10
+        assert cache.acquire('new.wav')
+        assert not cache.acquire('missing.wav')
+
+
+def main():
+    """Run all TTS cache tests"""
+    print("🧪 Testing TTS audio cache...")
+    tests = [test_least_recently_used_entry_is_evicted, test_pinned_entry_survives_eviction,
+             test_pinned_renders_missing_entry]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__ or test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__doc__ or test.__name__}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
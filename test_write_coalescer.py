@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+AdinavAI Write Coalescer Test Script
+Checks that many family data mutations turn into few writes, and none are lost
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'agents'))
+
+from write_coalescer import WriteCoalescer
+
+
+class FlushRecorder:
+    """Flush function that remembers how many mutations each flush saw"""
+
+    def __init__(self):
+        self.writes = []
+        self.coalescer = None
+
+    def __call__(self):
+        self.writes.append(self.coalescer._pending)
+
+
+def make_coalescer(**kwargs):
+    recorder = FlushRecorder()
+    coalescer = WriteCoalescer(recorder, **kwargs)
+    recorder.coalescer = coalescer
+    return coalescer, recorder
+
+
+def test_flushes_after_max_pending():
+    """The max_pending-th mutation writes once, covering every mutation"""
+    coalescer, recorder = make_coalescer(max_pending=5, max_delay=60)
+    for _ in range(4):
+        coalescer.mark_dirty()
+    assert recorder.writes == []
+    coalescer.mark_dirty()
+    assert recorder.writes == [5]
+    assert not coalescer.dirty
+    coalescer.close()
+
+
+def test_flushes_after_max_delay():
+    """A lone mutation is written once the delay expires"""
+    coalescer, recorder = make_coalescer(max_pending=100, max_delay=0.05)
+    coalescer.mark_dirty()
+    deadline = time.monotonic() + 2
+    while not recorder.writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert recorder.writes == [1]
+    coalescer.close()
+
+
+def test_close_flushes_and_later_mutations_write_immediately():
+    """close() writes pending changes; after it, nothing waits for a timer"""
+    coalescer, recorder = make_coalescer(max_pending=100, max_delay=60)
+    coalescer.mark_dirty()
+    coalescer.mark_dirty()
+    coalescer.close()
+    assert recorder.writes == [2]
+    coalescer.mark_dirty()
+    assert recorder.writes == [2, 1]
+
+
+def test_flush_without_changes_writes_nothing():
+    coalescer, recorder = make_coalescer(max_pending=100, max_delay=60)
+    coalescer.flush()
+    coalescer.close()
+    assert recorder.writes == []
+
+
+def test_concurrent_mutations_are_all_written():
+    """Mutations from many threads are counted once each and all reach a write"""
+    coalescer, recorder = make_coalescer(max_pending=7, max_delay=60)
+    threads = [threading.Thread(target=lambda: [coalescer.mark_dirty() for _ in range(50)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    coalescer.close()
+    assert sum(recorder.writes) == 400
+    assert coalescer.get_stats()['mutations'] == 400
+    assert len(recorder.writes) < 400
+
+
+def main():
+    """Run all write coalescer tests"""
+    print("🧪 Testing write coalescer...")
+    tests = [test_flushes_after_max_pending, test_flushes_after_max_delay,
+             test_close_flushes_and_later_mutations_write_immediately,
+             test_flush_without_changes_writes_nothing, test_concurrent_mutations_are_all_written]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__ or test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__doc__ or test.__name__}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -73,9 +73,11 @@ def start_conversation(member_name):
 @app.route('/ai_status')
 def ai_status():
     """Check if AI is working properly"""
-    is_working = ai_chat_agent.test_ai_connection()
+    ai_health = ai_chat_agent.get_ai_health()
     return jsonify({
-        'ai_connected': is_working,
+        'ai_connected': ai_health['connected'],
+        'model_loaded': ai_health['model_loaded'],
+        'checked_at': ai_health['checked_at'],
         'model': ai_chat_agent.model_name,
         'ollama_url': ai_chat_agent.ollama_url
     })
@@ -97,7 +99,7 @@ if __name__ == '__main__':
     
     # Test AI connection
     print("Testing AI connection...")
-    if ai_chat_agent.test_ai_connection():
+    if ai_chat_agent.test_ai_connection(refresh=True):
         print("✓ AI model (GPT-OSS 20B) is ready!")
         print("✓ AdinavAI is now powered by advanced AI")
     else: